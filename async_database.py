@@ -0,0 +1,181 @@
+"""
+Async Database Helper Functions
+
+Motor-based mirror of database.py for the async API routes. Calls run on the
+event loop instead of Starlette's threadpool, so request concurrency is not
+capped by the pool size. Query planning helpers are shared with database.py.
+
+The client is not created on import: the app's lifespan hook calls connect()
+on startup and close() on shutdown.
+"""
+
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timezone
+import os
+from dotenv import load_dotenv
+from typing import Union, Iterable
+from pydantic import BaseModel
+
+from db_common import (
+    RESERVATION_INDEXES,
+    IMPORT_KEY_FIELDS,
+    client_options,
+    prepare_upserts,
+    plan_upserts,
+    finish_upserts,
+)
+
+# Load environment variables from .env file
+load_dotenv()
+
+_client = None
+db = None
+
+def connect():
+    """Create the shared client from DATABASE_URL/DATABASE_NAME (idempotent)"""
+    global _client, db
+    if _client is not None:
+        return db
+
+    database_url = os.getenv("DATABASE_URL")
+    database_name = os.getenv("DATABASE_NAME")
+    if database_url and database_name:
+        _client = AsyncIOMotorClient(database_url, **client_options())
+        db = _client[database_name]
+    return db
+
+def close():
+    """Close the shared client and drop its pooled connections"""
+    global _client, db
+    if _client is not None:
+        _client.close()
+    _client = None
+    db = None
+
+def get_db():
+    """Current database handle, or None when not connected"""
+    return db
+
+async def ping(timeout: float) -> bool:
+    """Round-trip a ping to the server, giving up after `timeout` seconds"""
+    if db is None:
+        return False
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+# Helper functions for common database operations
+async def create_document(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    # Convert Pydantic model to dict if needed
+    if isinstance(data, BaseModel):
+        data_dict = data.model_dump()
+    else:
+        data_dict = data.copy()
+
+    data_dict['created_at'] = datetime.now(timezone.utc)
+    data_dict['updated_at'] = datetime.now(timezone.utc)
+
+    result = await db[collection_name].insert_one(data_dict)
+    return str(result.inserted_id)
+
+async def create_documents(collection_name: str, items: Iterable[Union[BaseModel, dict]]):
+    """Insert many documents in one unordered batch with shared timestamps
+
+    Returns (inserted_ids, errors) as in database.create_documents.
+    """
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    now = datetime.now(timezone.utc)
+    docs = []
+    for item in items:
+        data_dict = item.model_dump() if isinstance(item, BaseModel) else item.copy()
+        data_dict['created_at'] = now
+        data_dict['updated_at'] = now
+        docs.append(data_dict)
+
+    if not docs:
+        return [], []
+
+    failed = {}
+    try:
+        await db[collection_name].insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        failed = {err["index"]: err.get("errmsg", "write error") for err in e.details.get("writeErrors", [])}
+
+    inserted_ids = [None if i in failed else str(d["_id"]) for i, d in enumerate(docs)]
+    errors = [{"index": i, "error": msg} for i, msg in sorted(failed.items())]
+    return inserted_ids, errors
+
+async def upsert_documents(collection_name: str, items: Iterable[Union[BaseModel, dict]], key_fields: tuple):
+    """Upsert documents keyed on key_fields in one bulk_write
+
+    Returns (results, errors) as in database.upsert_documents.
+    """
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    docs, lookup, projection = prepare_upserts(items, key_fields)
+    if not docs:
+        return [], []
+
+    collection = db[collection_name]
+    existing = await collection.find(lookup, projection).to_list(length=None)
+    results, ops, op_items = plan_upserts(docs, existing, key_fields)
+
+    upserted_ids, write_errors = {}, []
+    if ops:
+        try:
+            upserted_ids = (await collection.bulk_write(ops, ordered=False)).upserted_ids
+        except BulkWriteError as e:
+            upserted_ids = {u["index"]: u["_id"] for u in e.details.get("upserted", [])}
+            write_errors = e.details.get("writeErrors", [])
+
+    errors = finish_upserts(results, op_items, upserted_ids, write_errors)
+    return results, errors
+
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
+    """Get documents from collection"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    cursor = db[collection_name].find(filter_dict or {})
+    if limit:
+        cursor = cursor.limit(limit)
+
+    return await cursor.to_list(length=None)
+
+def iter_documents(collection_name: str, filter_dict: dict = None, sort: list = None, limit: int = None, projection: dict = None):
+    """Cursor over documents from collection; consume it with `async for`"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    cursor = db[collection_name].find(filter_dict or {}, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    return cursor
+
+async def ensure_indexes():
+    """Create the indexes used by the API (idempotent)"""
+    if db is None:
+        return
+
+    for keys in RESERVATION_INDEXES:
+        await db["reservation"].create_index(keys)
+    await db["reservation"].create_index(
+        [(f, ASCENDING) for f in IMPORT_KEY_FIELDS],
+        unique=True,
+        partialFilterExpression={"import_key": {"$exists": True}},
+    )
@@ -0,0 +1,134 @@
+"""
+API Benchmarks
+
+Drives the FastAPI app in-process over httpx's ASGI transport (no network,
+no server), against whatever database benchmarks.db connected:
+
+- list_reservations under every combination of its filters
+- the email, provider and sync import endpoints
+- inserts one document per round trip (create_document) against one batch
+  (create_documents, and the import path's upsert_documents)
+"""
+
+import itertools
+import uuid
+from typing import Dict, List
+
+import httpx
+
+import main
+from async_database import IMPORT_KEY_FIELDS, create_document, create_documents, upsert_documents
+
+from .generators import make_emails
+from .harness import measure_async
+
+SUITE = "api"
+
+# One value per list_reservations filter; every subset is benchmarked
+RESERVATION_FILTERS = {
+    "q": "tour",
+    "category": "lodging",
+    "provider": "agoda",
+    "location": "Rome",
+    "start": "2025-03-01T00:00:00",
+    "end": "2025-09-01T00:00:00",
+}
+
+
+def filter_combinations() -> List[Dict[str, str]]:
+    names = list(RESERVATION_FILTERS)
+    combos = []
+    for size in range(len(names) + 1):
+        for subset in itertools.combinations(names, size):
+            combos.append({n: RESERVATION_FILTERS[n] for n in subset})
+    return combos
+
+
+async def _get(client: httpx.AsyncClient, url: str, params: Dict) -> None:
+    resp = await client.get(url, params=params)
+    resp.raise_for_status()
+
+
+async def _post(client: httpx.AsyncClient, url: str, payload: Dict) -> Dict:
+    resp = await client.post(url, json=payload)
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def run(itinerary_id: str, repeat: int = 5, emails: int = 500, page_size: int = 100, seed: int = 7) -> List[Dict]:
+    records = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        url = f"/api/itineraries/{itinerary_id}/reservations"
+        for combo in filter_combinations():
+            params = {**combo, "limit": page_size}
+            name = "list_reservations[" + ",".join(combo) + "]"
+            records.append(await measure_async(
+                SUITE, name, lambda p=params: _get(client, url, p), repeat=repeat, params=params,
+            ))
+        records.append(await measure_async(
+            SUITE, "list_reservations[ndjson]", lambda: _get(client, url, {"format": "ndjson"}),
+            repeat=repeat, params={"format": "ndjson"},
+        ))
+        records.append(await measure_async(
+            SUITE, "list_reservations[compact]", lambda: _get(client, url, {"view": "compact", "limit": page_size}),
+            repeat=repeat, params={"view": "compact", "limit": page_size},
+        ))
+
+        messages = [
+            {"subject": m["subject"], "sender": m["from"], "body_text": m["body_text"]}
+            for m in make_emails(emails, seed)
+        ]
+
+        async def import_fresh():
+            target = await create_document("itinerary", {"name": "import bench", "start_date": None, "end_date": None})
+            await _post(client, "/api/import/email", {"itinerary_id": target, "messages": messages})
+
+        records.append(await measure_async(
+            SUITE, "import_email[new]", import_fresh, repeat=repeat, ops=emails, params={"messages": emails},
+        ))
+        records.append(await measure_async(
+            SUITE, "import_email[repeat]",
+            lambda: _post(client, "/api/import/email", {"itinerary_id": itinerary_id, "messages": messages}),
+            repeat=repeat, ops=emails, params={"messages": emails},
+        ))
+        records.append(await measure_async(
+            SUITE, "import_provider",
+            lambda: _post(client, "/api/import/provider",
+                          {"itinerary_id": itinerary_id, "provider": "agoda", "access_token": "bench"}),
+            repeat=repeat,
+        ))
+        tokens = {p: "bench" for p in main.SUPPORTED_PROVIDERS}
+        records.append(await measure_async(
+            SUITE, "import_sync",
+            lambda: _post(client, "/api/import/sync", {"itinerary_id": itinerary_id, "access_tokens": tokens}),
+            repeat=repeat, ops=len(tokens),
+        ))
+
+    inserts = 1000
+
+    def new_rows() -> List[Dict]:
+        run_id = uuid.uuid4().hex[:8]
+        return [
+            {"itinerary_id": itinerary_id, "title": f"bench {i}", "category": "other",
+             "provider": "bench", "import_key": f"{run_id}-{i}"}
+            for i in range(inserts)
+        ]
+
+    async def create_each():
+        for row in new_rows():
+            await create_document("reservation", row)
+
+    async def create_batch():
+        _, errors = await create_documents("reservation", new_rows())
+        assert not errors, errors[:3]
+
+    async def upsert_batch():
+        _, failed = await upsert_documents("reservation", new_rows(), IMPORT_KEY_FIELDS)
+        assert not failed, failed[:3]
+
+    params = {"documents": inserts}
+    records.append(await measure_async(SUITE, "create_document", create_each, repeat=repeat, ops=inserts, warmup=0, params=params))
+    records.append(await measure_async(SUITE, "create_documents[batch]", create_batch, repeat=repeat, ops=inserts, warmup=0, params=params))
+    records.append(await measure_async(SUITE, "upsert_documents[batch]", upsert_batch, repeat=repeat, ops=inserts, warmup=0, params=params))
+    return records
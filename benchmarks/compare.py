@@ -0,0 +1,66 @@
+"""
+Compare Benchmark Runs
+
+Matches the results of two benchmarks.run outputs by suite, name and params
+and reports the change in best time. Exits non-zero when any result got
+slower than --threshold percent, so it can gate a CI job.
+
+    python -m benchmarks.compare base.json head.json [--threshold 10] [--json]
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+
+def _key(record: Dict) -> Tuple[str, str, str]:
+    return record["suite"], record["name"], json.dumps(record.get("params", {}), sort_keys=True)
+
+
+def compare(base: Dict, head: Dict) -> List[Dict]:
+    before = {_key(r): r for r in base.get("results", [])}
+    rows = []
+    for record in head.get("results", []):
+        old = before.get(_key(record))
+        if old is None or not old["min_ms"]:
+            continue
+        rows.append({
+            "suite": record["suite"],
+            "name": record["name"],
+            "base_ms": old["min_ms"],
+            "head_ms": record["min_ms"],
+            "change_pct": round((record["min_ms"] - old["min_ms"]) / old["min_ms"] * 100, 1),
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Slowdown (%%) that counts as a regression")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    rows = compare(base, head)
+    regressions = [r for r in rows if r["change_pct"] > args.threshold]
+
+    if args.json:
+        print(json.dumps({"base": base["meta"].get("commit"), "head": head["meta"].get("commit"),
+                          "rows": rows, "regressions": len(regressions)}, indent=2))
+    else:
+        print(f"{'suite':<10} {'name':<55} {'base ms':>10} {'head ms':>10} {'change':>8}")
+        for r in rows:
+            flag = "  !" if r in regressions else ""
+            print(f"{r['suite']:<10} {r['name'][:55]:<55} {r['base_ms']:>10.2f} {r['head_ms']:>10.2f} "
+                  f"{r['change_pct']:>+7.1f}%{flag}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
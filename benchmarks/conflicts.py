@@ -0,0 +1,97 @@
+"""
+Conflict Detection Benchmark
+
+Times the sort-and-sweep in conflicts.py against the naive pairwise check on
+seeded synthetic itineraries, and checks both report the same conflicts.
+Pairwise is quadratic, so it only runs up to --pairwise-max entries.
+
+    python -m benchmarks.conflicts [--sizes 1000,10000,50000] [--seed 7]
+
+Prints one JSON object with timings per itinerary size.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from bson import ObjectId
+
+from conflicts import conflict_kind, find_conflicts, find_conflicts_async
+
+CATEGORIES = ["lodging", "activity", "activity", "dining", "transport", "flight"]
+
+
+def make_itinerary(count: int, seed: int) -> List[Dict]:
+    """Seeded reservations with occasional overlaps, in the order the cursor returns them"""
+    rng = random.Random(seed)
+    base = datetime(2025, 1, 1)
+    span_minutes = max(count, 1) * 90
+    docs = []
+    for i in range(count):
+        category = rng.choice(CATEGORIES)
+        start = base + timedelta(minutes=rng.randrange(span_minutes))
+        hours = rng.randrange(24, 96) if category == "lodging" else rng.randrange(1, 4)
+        end = None if rng.random() < 0.1 else start + timedelta(hours=hours)
+        docs.append({"_id": ObjectId(), "title": f"R{i}", "category": category, "start_time": start, "end_time": end})
+    docs.sort(key=lambda d: (d["start_time"], d["_id"]))
+    return docs
+
+
+def pairwise_count(docs: List[Dict]) -> int:
+    def span(d):
+        return d["start_time"], max(d["end_time"] or d["start_time"], d["start_time"])
+
+    count = 0
+    for i, a in enumerate(docs):
+        a_start, a_end = span(a)
+        for b in docs[i + 1:]:
+            if conflict_kind(a) != conflict_kind(b):
+                continue
+            b_start, b_end = span(b)
+            if b_start == a_start or (b_start < a_end and a_start < b_end):
+                count += 1
+    return count
+
+
+async def _cursor(docs: List[Dict]):
+    for doc in docs:
+        yield doc
+
+
+def timed(fn, *args) -> tuple:
+    started = time.perf_counter()
+    value = fn(*args)
+    return value, round((time.perf_counter() - started) * 1000, 2)
+
+
+def run(sizes: List[int], seed: int = 7, pairwise_max: int = 2000) -> Dict:
+    rows = []
+    for size in sizes:
+        docs = make_itinerary(size, seed)
+        sweep, sweep_ms = timed(find_conflicts, docs, 1000)
+        _, async_ms = timed(lambda d: asyncio.run(find_conflicts_async(_cursor(d), 1000)), docs)
+        row = {"entries": size, "conflicts": sweep["count"], "sweep_ms": sweep_ms, "sweep_async_ms": async_ms}
+        if size <= pairwise_max:
+            count, pairwise_ms = timed(pairwise_count, docs)
+            assert count == sweep["count"], (count, sweep["count"])
+            row["pairwise_ms"] = pairwise_ms
+        rows.append(row)
+    return {"benchmark": "conflicts", "seed": seed, "results": rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,5000,10000,50000")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--pairwise-max", type=int, default=2000)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    print(json.dumps(run(sizes, args.seed, args.pairwise_max), indent=2))
+
+
+if __name__ == "__main__":
+    main()
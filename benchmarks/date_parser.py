@@ -0,0 +1,96 @@
+"""
+Email Date Parser Benchmark
+
+Measures providers.date_parser batch throughput on seeded hints against a
+strptime baseline that tries each format in turn, and counts hints where the
+two disagree. The correctness corpus lives in tests/test_date_parser.py.
+
+    python -m benchmarks.date_parser [--count 100000] [--seed 7]
+
+Prints one JSON object.
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from providers import date_parser
+
+STRPTIME_FORMATS = [
+    "%Y-%m-%d", "%Y-%m-%d %H:%M", "%Y-%m-%d %I:%M %p", "%Y-%m-%d %I:%M%p",
+    "%d %B %Y", "%d %b %Y", "%d %B %Y %H:%M", "%d %b %Y %H:%M",
+    "%d %B %Y %I:%M %p", "%d %b %Y %I:%M %p", "%d %B %Y %I:%M%p", "%d %b %Y %I:%M%p",
+    "%B %d, %Y", "%b %d, %Y", "%B %d, %Y %H:%M", "%b %d, %Y %H:%M",
+    "%B %d, %Y %I:%M %p", "%b %d, %Y %I:%M %p", "%B %d, %Y %I:%M%p", "%b %d, %Y %I:%M%p",
+]
+
+
+def strptime_parse(hint: Optional[str]) -> Optional[datetime]:
+    if not hint:
+        return None
+    text = " ".join(p for p in hint.split() if p != "None")
+    for fmt in STRPTIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def make_hints(count: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    months = ["January", "Feb", "March", "Apr", "May", "June", "Jul", "August", "Sep", "October", "Nov", "December"]
+    hints = []
+    for _ in range(count):
+        y, m, d = rng.randrange(2024, 2027), rng.randrange(1, 13), rng.randrange(1, 29)
+        shape = rng.randrange(3)
+        if shape == 0:
+            day = f"{y}-{m:02d}-{d:02d}"
+        elif shape == 1:
+            day = f"{d} {months[m - 1]} {y}"
+        else:
+            day = f"{months[m - 1]} {d}, {y}"
+        at = rng.choice([None, f"{rng.randrange(24)}:{rng.randrange(60):02d}",
+                         f"{rng.randrange(1, 13)}:{rng.randrange(60):02d} {rng.choice(['AM', 'PM'])}"])
+        hints.append(f"{day} {at}")
+    return hints
+
+
+def run(count: int = 100000, seed: int = 7) -> Dict:
+    hints = make_hints(count, seed)
+    pairs = [(h, None) for h in hints]
+
+    date_parser.split_hint.cache_clear()
+    started = time.perf_counter()
+    parsed = date_parser.parse_hint_pairs(pairs)
+    parser_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    baseline = [strptime_parse(h) for h in hints]
+    strptime_s = time.perf_counter() - started
+
+    mismatches = sum(1 for (a, _), b in zip(parsed, baseline) if a != b)
+    return {
+        "benchmark": "date_parser",
+        "count": count,
+        "seed": seed,
+        "parser_hints_per_s": round(count / parser_s),
+        "strptime_hints_per_s": round(count / strptime_s),
+        "speedup": round(strptime_s / parser_s, 1),
+        "baseline_mismatches": mismatches,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(run(args.count, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark Database Setup
+
+Points async_database at either a local mongod (DATABASE_URL, with its own
+throwaway DATABASE_NAME) or an in-memory stand-in (mongomock_motor, optional:
+install it to benchmark without a server), and seeds it from the generators.
+"""
+
+import os
+from typing import Dict, List
+
+import async_database
+from async_database import ensure_indexes
+from search import with_search_tokens
+
+from .generators import iter_reservations, make_itineraries
+
+SEED_BATCH_SIZE = 10000
+
+
+async def open_database(backend: str, name: str = "itinerary_bench"):
+    """Connect async_database to the chosen backend and return the db handle.
+
+    The benchmark database is dropped first, so runs start from the same state.
+    """
+    async_database.close()
+    if backend == "mongod":
+        os.environ.setdefault("DATABASE_URL", "mongodb://localhost:27017")
+        os.environ["DATABASE_NAME"] = name
+        db = async_database.connect()
+        await db.client.drop_database(name)
+    elif backend == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            raise SystemExit("The memory backend needs mongomock-motor: pip install mongomock-motor")
+        db = AsyncMongoMockClient()[name]
+        async_database.db = db
+        # mongomock has no query planner, and its unique index check scans
+        # the collection on every insert, which makes seeding quadratic
+        return db
+    else:
+        raise SystemExit(f"Unknown backend: {backend}")
+    await ensure_indexes()
+    return db
+
+
+async def seed(db, itineraries: int, reservations: int, seed: int = 7) -> Dict[str, List[str]]:
+    """Insert generated itineraries and reservations; returns itinerary ids"""
+    docs = make_itineraries(itineraries, seed)
+    result = await db["itinerary"].insert_many(docs)
+    ids = [str(i) for i in result.inserted_ids]
+
+    batch = []
+    for doc in iter_reservations(ids, reservations, seed):
+        batch.append(with_search_tokens(doc))
+        if len(batch) >= SEED_BATCH_SIZE:
+            await db["reservation"].insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db["reservation"].insert_many(batch, ordered=False)
+    return {"itinerary_ids": ids}
@@ -0,0 +1,165 @@
+"""
+Synthetic Data Generators
+
+Seeded, deterministic generators for benchmark data: itineraries,
+reservations (streamed, so a million never sit in memory at once), provider
+confirmation emails shaped like the real ones parse_email sees, and Gmail API
+payloads for extract_body_text (with attachments, or one large plain part).
+The same seed always yields the same data.
+"""
+
+import base64
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from bson import ObjectId
+
+CATEGORIES = ["lodging", "flight", "activity", "transport", "dining", "other"]
+PROVIDERS = ["booking.com", "agoda", "viator", "klook", "getyourguide", "email"]
+CITIES = ["Rome", "Paris", "Tokyo", "Lisbon", "Bangkok", "Hong Kong", "Vatican City", "Phuket", "Kyoto", "Seville"]
+HOTELS = ["Aurora", "Seaside Inn", "Grand Palace", "Old Town Suites", "Riverside Lodge", "Casa Blanca"]
+ACTIVITIES = ["Colosseum Guided Tour", "Vatican Museums Skip-the-Line", "Sunset Kayak Trip",
+              "Street Food Walk", "Disneyland Ticket", "Cooking Class"]
+WORDS = ["tour", "sea", "museum", "hotel", "old", "town", "night", "market", "river", "view", "grand", "city"]
+BASE_TIME = datetime(2025, 1, 1)
+
+
+def itinerary_doc(rng: random.Random, i: int) -> Dict:
+    start = BASE_TIME + timedelta(days=rng.randrange(365))
+    return {
+        "name": f"Trip {i}",
+        "start_date": start,
+        "end_date": start + timedelta(days=rng.randrange(2, 21)),
+        "locations": rng.sample(CITIES, rng.randrange(1, 4)),
+        "notes": None,
+    }
+
+
+def make_itineraries(count: int, seed: int = 7) -> List[Dict]:
+    rng = random.Random(seed)
+    return [itinerary_doc(rng, i) for i in range(count)]
+
+
+def reservation_doc(rng: random.Random, i: int, itinerary_id: str) -> Dict:
+    category = rng.choice(CATEGORIES)
+    start = None if rng.random() < 0.05 else BASE_TIME + timedelta(minutes=rng.randrange(60 * 24 * 365))
+    end = start + timedelta(hours=rng.randrange(1, 72)) if start and rng.random() < 0.8 else None
+    title = " ".join(rng.sample(WORDS, 3)).title()
+    return {
+        "itinerary_id": itinerary_id,
+        "provider": rng.choice(PROVIDERS),
+        "category": category,
+        "title": f"{title} {i}",
+        "location": rng.choice(CITIES),
+        "start_time": start,
+        "end_time": end,
+        "confirmation_number": f"CN-{rng.randrange(10 ** 8):08d}",
+        "details": {
+            "raw_subject": f"Your booking confirmation #{i}",
+            "sender": "no-reply@example.com",
+            "guests": rng.randrange(1, 5),
+            "price": {"amount": round(rng.uniform(20, 900), 2), "currency": "EUR"},
+        },
+        "source": rng.choice(["api", "email", "manual"]),
+    }
+
+
+def iter_reservations(itinerary_ids: List[str], count: int, seed: int = 7) -> Iterator[Dict]:
+    """`count` reservations spread over the itineraries, generated lazily"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield reservation_doc(rng, i, rng.choice(itinerary_ids))
+
+
+def make_reservation_docs(count: int, seed: int = 7) -> List[Dict]:
+    """Reservations as read back from Mongo (with _id and timestamps)"""
+    docs = []
+    for doc in iter_reservations([str(ObjectId()) for _ in range(16)], count, seed):
+        doc.update({"_id": ObjectId(), "created_at": BASE_TIME, "updated_at": BASE_TIME})
+        docs.append(doc)
+    return docs
+
+
+def _date_text(rng: random.Random, day: datetime) -> str:
+    shape = rng.randrange(3)
+    if shape == 0:
+        return day.strftime("%Y-%m-%d")
+    if shape == 1:
+        return f"{day.day} {day.strftime(rng.choice(['%B', '%b']))} {day.year}"
+    return f"{day.strftime('%B')} {day.day}, {day.year}"
+
+
+def email_message(rng: random.Random, i: int) -> Dict:
+    """One confirmation email in the style of a random provider"""
+    provider = rng.choice(["booking.com", "agoda", "viator", "klook", "getyourguide"])
+    city = rng.choice(CITIES)
+    check_in = BASE_TIME + timedelta(days=rng.randrange(365))
+    check_out = check_in + timedelta(days=rng.randrange(1, 8))
+    conf = f"{provider[:2].upper()}-{rng.randrange(10 ** 6, 10 ** 7)}"
+    footer = "\n".join(
+        "We look forward to welcoming you. Manage your booking online at any time." for _ in range(rng.randrange(5, 40))
+    )
+    if provider in ("booking.com", "agoda"):
+        hotel = rng.choice(HOTELS)
+        subject = f"Reservation confirmed: Hotel {hotel}"
+        body = (
+            f"Dear traveller,\n\nThank you for booking with {provider}.\n"
+            f"Hotel: {hotel}\nLocation: {city}\n"
+            f"Confirmation number: {conf}\n"
+            f"Check-in: {_date_text(rng, check_in)} {rng.randrange(12, 16)}:00\n"
+            f"Check-out: {_date_text(rng, check_out)} {rng.randrange(9, 12)}:00 AM\n\n{footer}"
+        )
+    else:
+        activity = rng.choice(ACTIVITIES)
+        subject = f"Your {provider.title()} booking: \"{activity}\""
+        body = (
+            f"Hi,\n\nYour ticket is confirmed.\nActivity: {activity}\nMeeting point in {city}\n"
+            f"Confirmation #{conf}\n"
+            f"Date: {_date_text(rng, check_in)} {rng.randrange(1, 12)}:{rng.choice(['00', '30'])} "
+            f"{rng.choice(['AM', 'PM'])}\n\n{footer}"
+        )
+    return {"subject": subject, "from": f"no-reply@{provider}", "body_text": body}
+
+
+def iter_emails(count: int, seed: int = 7) -> Iterator[Dict]:
+    rng = random.Random(seed)
+    for i in range(count):
+        yield email_message(rng, i)
+
+
+def make_emails(count: int, seed: int = 7) -> List[Dict]:
+    return list(iter_emails(count, seed))
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def make_gmail_payloads(count: int, seed: int = 7, attachment_kb: int = 512) -> List[List[Dict]]:
+    """Gmail `payload.parts` lists: plain + HTML alternatives and a PDF attachment"""
+    rng = random.Random(seed)
+    attachment = _b64("%PDF-1.4 " + "x" * (attachment_kb * 1024))
+    payloads = []
+    for i in range(count):
+        msg = email_message(rng, i)
+        html = "<html><body>" + msg["body_text"].replace("\n", "<br>") + "</body></html>"
+        payloads.append([
+            {"mimeType": "multipart/alternative", "parts": [
+                {"mimeType": "text/plain", "body": {"data": _b64(msg["body_text"])}},
+                {"mimeType": "text/html", "body": {"data": _b64(html)}},
+            ]},
+            {"mimeType": "application/pdf", "body": {"data": attachment}},
+        ])
+    return payloads
+
+
+def make_large_plain_payloads(count: int, seed: int = 7, plain_kb: int = 2048) -> List[List[Dict]]:
+    """Gmail `payload.parts` lists holding one large text/plain part each"""
+    rng = random.Random(seed)
+    payloads = []
+    for i in range(count):
+        msg = email_message(rng, i)
+        text = (msg["body_text"] + "\n") * (plain_kb * 1024 // (len(msg["body_text"]) + 1) + 1)
+        payloads.append([{"mimeType": "text/plain", "body": {"data": _b64(text[:plain_kb * 1024])}}])
+    return payloads
@@ -0,0 +1,99 @@
+"""
+Benchmark Harness
+
+Timing helpers and the machine-readable result format shared by the suites.
+Every measurement is one record:
+
+    {"suite": ..., "name": ..., "params": {...}, "repeat": N, "ops": n,
+     "min_ms": ..., "median_ms": ..., "mean_ms": ..., "ops_per_s": ...}
+
+where `ops` is the number of operations in one timed run (e.g. messages
+parsed), so ops_per_s is comparable across machines and commits. Suites that
+track memory add "peak_alloc_kb" from peak_alloc_kb().
+"""
+
+import asyncio
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+def _record(suite: str, name: str, timings: List[float], ops: int, params: Optional[Dict]) -> Dict:
+    best = min(timings)
+    return {
+        "suite": suite,
+        "name": name,
+        "params": params or {},
+        "repeat": len(timings),
+        "ops": ops,
+        "min_ms": round(best * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "ops_per_s": round(ops / best, 1) if best > 0 else None,
+    }
+
+
+def measure(suite: str, name: str, fn: Callable[[], object], repeat: int = 5, ops: int = 1,
+            params: Optional[Dict] = None, warmup: int = 1) -> Dict:
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return _record(suite, name, timings, ops, params)
+
+
+async def measure_async(suite: str, name: str, fn: Callable[[], Awaitable[object]], repeat: int = 5,
+                        ops: int = 1, params: Optional[Dict] = None, warmup: int = 1) -> Dict:
+    for _ in range(warmup):
+        await fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - started)
+    return _record(suite, name, timings, ops, params)
+
+
+def peak_alloc_kb(fn: Callable[[], object]) -> float:
+    """Peak Python heap allocated during one call of `fn`, in KiB (tracemalloc)"""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_metadata(**extra) -> Dict:
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        **extra,
+    }
+
+
+def run_coroutine(coro):
+    """asyncio.run, kept in one place so suites share the event loop policy"""
+    return asyncio.run(coro)
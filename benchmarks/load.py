@@ -0,0 +1,181 @@
+"""
+Concurrent Load Benchmark
+
+Seeds a local mongod, starts the app under uvicorn and fires reservation list
+requests at it over HTTP (httpx) at increasing concurrency levels, reporting
+throughput, latency percentiles and errors per level. Route handlers and the
+data layer are async, so throughput should keep rising past the threadpool
+limit (reported as threadpool_limit) instead of flattening at it, as it did
+when every request held a worker thread for its blocking pymongo calls.
+
+    DATABASE_URL=mongodb://localhost:27017 python -m benchmarks.load [--concurrency 1,10,40,80,160,320]
+
+Needs DATABASE_URL: the in-memory backend runs every call inline on the event
+loop, so it cannot show concurrency. The benchmark database (--database) is
+dropped and recreated. The client shares the machine with the server; run
+with --url against a server elsewhere to take it out of the measurement.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack
+from typing import Dict, List, Optional
+
+import anyio.to_thread
+import httpx
+
+import async_database
+
+from .db import open_database, seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY_TIMEOUT_SECONDS = 120
+
+
+def request_paths(itinerary_ids: List[str], page_size: int) -> List[str]:
+    """A mix of plain and filtered list pages across the seeded itineraries"""
+    paths = []
+    for itinerary_id in itinerary_ids:
+        base = f"/api/itineraries/{itinerary_id}/reservations?limit={page_size}"
+        paths.append(base)
+        paths.append(base + "&category=lodging")
+    return paths
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_NAME": database}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+
+
+async def wait_ready(url: str, server: Optional[subprocess.Popen]) -> None:
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    async with httpx.AsyncClient(base_url=url, timeout=2) as client:
+        while time.monotonic() < deadline:
+            if server is not None and server.poll() is not None:
+                raise SystemExit(f"Server exited with status {server.returncode}")
+            try:
+                if (await client.get("/readyz")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.25)
+    raise SystemExit(f"Server at {url} not ready after {READY_TIMEOUT_SECONDS}s")
+
+
+async def fire(url: str, paths: List[str], total: int, concurrency: int) -> Dict:
+    """Send `total` GETs from `concurrency` workers, each with one request in flight.
+
+    Every worker has its own client and connection: a single shared httpx
+    pool contends with itself at high concurrency and would cap the result.
+    """
+    latencies: List[float] = []
+    errors = 0
+    queue = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for i in queue:
+            started = time.perf_counter()
+            try:
+                ok = (await client.get(paths[i % len(paths)])).status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    async with AsyncExitStack() as stack:
+        clients = [await stack.enter_async_context(httpx.AsyncClient(base_url=url, timeout=60))
+                   for _ in range(concurrency)]
+        # One warm-up request per client opens its connection outside the timed window
+        await asyncio.gather(*(c.get(paths[i % len(paths)]) for i, c in enumerate(clients)))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(c) for c in clients))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+async def run(levels: List[int], requests: int = 2000, itineraries: int = 20, reservations: int = 100000,
+              page_size: int = 50, database: str = "itinerary_load", url: Optional[str] = None,
+              seed_value: int = 7) -> Dict:
+    db = await open_database("mongod", database)
+    seeded = await seed(db, itineraries, reservations, seed_value)
+    async_database.close()
+    paths = request_paths(seeded["itinerary_ids"], page_size)
+
+    server = None
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = start_server(database, port)
+    try:
+        await wait_ready(url, server)
+        rows = [await fire(url, paths, max(requests, level), level) for level in levels]
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    baseline = rows[0]["requests_per_s"]
+    for row in rows:
+        row["scaling"] = round(row["requests_per_s"] / baseline, 2)
+    return {
+        "benchmark": "load",
+        "seed": seed_value,
+        "itineraries": itineraries,
+        "reservations": reservations,
+        "page_size": page_size,
+        "threadpool_limit": anyio.to_thread.current_default_thread_limiter().total_tokens,
+        "cpu_count": os.cpu_count(),
+        "results": rows,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", default="1,10,40,80,160,320", help="Comma-separated levels")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per level")
+    parser.add_argument("--itineraries", type=int, default=20)
+    parser.add_argument("--reservations", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--database", default="itinerary_load")
+    parser.add_argument("--url", default=None, help="Load a server already running against --database instead of starting one")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    if not os.getenv("DATABASE_URL"):
+        parser.error("DATABASE_URL must point at a local mongod")
+    levels = [int(n) for n in args.concurrency.split(",") if n]
+    result = asyncio.run(run(levels, args.requests, args.itineraries, args.reservations,
+                             args.page_size, args.database, args.url, args.seed))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Parallel Email Parsing Benchmark
+
+Sweeps providers.gmail.messages_to_reservations over workers=1..N on one
+seeded mailbox and reports throughput and speedup over the serial parse
+(workers=1) per worker count, checking every run returns the serial output
+in the same order. Each worker count gets a warm-up call first, so process
+pool start-up is not timed.
+
+    python -m benchmarks.parallel_parse [--messages 20000] [--max-workers 8] [--chunk-size 250]
+
+Prints one JSON object. Speedup is bounded by the cores actually available
+(reported as cpu_count).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Dict, Optional
+
+from providers.gmail import messages_to_reservations, shutdown_parse_pool
+
+from .generators import make_emails
+
+
+def run(messages: int = 20000, max_workers: Optional[int] = None, chunk_size: int = 250,
+        repeat: int = 3, seed: int = 7) -> Dict:
+    max_workers = max_workers or os.cpu_count() or 1
+    batch = make_emails(messages, seed)
+    expected = messages_to_reservations(batch, workers=1)
+    rows = []
+    baseline = None
+    try:
+        for workers in range(1, max_workers + 1):
+            out = messages_to_reservations(batch, workers=workers, chunk_size=chunk_size)
+            assert out == expected, f"workers={workers} changed the parse output"
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                messages_to_reservations(batch, workers=workers, chunk_size=chunk_size)
+                timings.append(time.perf_counter() - started)
+            best = min(timings)
+            baseline = baseline or best
+            rows.append({
+                "workers": workers,
+                "min_ms": round(best * 1000, 1),
+                "median_ms": round(statistics.median(timings) * 1000, 1),
+                "messages_per_s": round(messages / best, 1),
+                "speedup": round(baseline / best, 2),
+            })
+    finally:
+        shutdown_parse_pool()
+    return {
+        "benchmark": "parallel_parse",
+        "seed": seed,
+        "messages": messages,
+        "chunk_size": chunk_size,
+        "cpu_count": os.cpu_count(),
+        "results": rows,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--max-workers", type=int, default=None, help="Default: CPU count")
+    parser.add_argument("--chunk-size", type=int, default=250)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(run(args.messages, args.max_workers, args.chunk_size, args.repeat, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
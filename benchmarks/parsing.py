@@ -0,0 +1,65 @@
+"""
+Parsing Benchmarks
+
+CPU-bound email paths, no database: parse_email over generated provider
+confirmations and extract_body_text over Gmail payloads, both the generated
+ones (plain + HTML alternatives and a large attachment) and messages with a
+single large plain part. extract_body_text is compared with the path it
+replaced, which decoded every part in full before truncating; those records
+also carry the peak allocation of one call.
+"""
+
+from typing import Dict, List
+
+from providers.email_parsers import parse_email
+from providers.gmail import BODY_CHAR_BUDGET, decode_base64url, extract_body_text
+
+from .generators import make_emails, make_gmail_payloads, make_large_plain_payloads
+from .harness import measure, peak_alloc_kb
+
+SUITE = "parsing"
+LARGE_PLAIN_KB = 2048
+
+
+def decode_all_body_text(payload_parts: List[Dict]) -> str:
+    """The previous extract_body_text: decode every part with data, join, truncate"""
+    body = []
+
+    def walk(parts):
+        for p in parts:
+            mime = p.get('mimeType', '')
+            data = p.get('body', {}).get('data')
+            if data:
+                try:
+                    text = decode_base64url(data).decode('utf-8', errors='ignore')
+                    if mime.startswith('text/plain') or mime.startswith('text/html'):
+                        body.append(text)
+                except Exception:
+                    pass
+            if 'parts' in p:
+                walk(p['parts'])
+    walk(payload_parts)
+    return "\n".join(body)[:BODY_CHAR_BUDGET]
+
+
+def run(emails: int = 2000, repeat: int = 5, seed: int = 7) -> List[Dict]:
+    messages = make_emails(emails, seed)
+    payload_sets = {
+        "attachment": (make_gmail_payloads(min(emails, 200), seed), {"attachment_kb": 512}),
+        "large_plain": (make_large_plain_payloads(20, seed, LARGE_PLAIN_KB), {"plain_kb": LARGE_PLAIN_KB}),
+    }
+
+    def parse_all():
+        for m in messages:
+            parse_email(m["subject"], m["from"], m["body_text"])
+
+    records = [
+        measure(SUITE, "parse_email", parse_all, repeat=repeat, ops=len(messages), params={"messages": len(messages)}),
+    ]
+    for kind, (payloads, params) in payload_sets.items():
+        for name, extract in (("extract_body_text", extract_body_text), ("extract_body_text[decode_all]", decode_all_body_text)):
+            record = measure(SUITE, name, lambda e=extract, p=payloads: [e(parts) for parts in p], repeat=repeat,
+                             ops=len(payloads), params={"payloads": len(payloads), **params})
+            record["peak_alloc_kb"] = peak_alloc_kb(lambda e=extract, p=payloads[0]: e(p))
+            records.append(record)
+    return records
@@ -0,0 +1,90 @@
+"""
+Benchmark Runner
+
+Seeds a database with generated itineraries and reservations, runs the
+selected suites and writes one JSON document with run metadata and every
+measurement, for comparison across commits with benchmarks.compare.
+
+    python -m benchmarks.run --backend memory --reservations 20000 --output bench.json
+    python -m benchmarks.run --backend mongod --reservations 1000000 --suites api
+
+Suites: api, parsing, parallel_parse, serialization, conflicts, date_parser.
+The mongod backend uses DATABASE_URL (default mongodb://localhost:27017) and
+drops and recreates the benchmark database named by --database.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List
+
+from . import api, conflicts, date_parser, parallel_parse, parsing, serialization
+from .db import open_database, seed
+from .harness import run_coroutine, run_metadata
+
+SUITES = ["api", "parsing", "parallel_parse", "serialization", "conflicts", "date_parser"]
+MAX_RESERVATIONS = 1_000_000
+
+
+async def run_api(args) -> Dict:
+    db = await open_database(args.backend, args.database)
+    started = time.perf_counter()
+    seeded = await seed(db, args.itineraries, args.reservations, args.seed)
+    seed_s = time.perf_counter() - started
+    records = await api.run(seeded["itinerary_ids"][0], repeat=args.repeat, emails=args.emails, seed=args.seed)
+    return {"records": records, "seed_s": round(seed_s, 2)}
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the benchmark suites")
+    parser.add_argument("--backend", choices=["memory", "mongod"], default="memory")
+    parser.add_argument("--database", default="itinerary_bench")
+    parser.add_argument("--suites", default=",".join(SUITES))
+    parser.add_argument("--itineraries", type=int, default=20)
+    parser.add_argument("--reservations", type=int, default=20000)
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="-", help="File for the JSON results; - for stdout")
+    args = parser.parse_args(argv)
+
+    suites = [s for s in args.suites.split(",") if s]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+    if not 0 < args.reservations <= MAX_RESERVATIONS:
+        parser.error(f"--reservations must be between 1 and {MAX_RESERVATIONS}")
+
+    meta = run_metadata(
+        backend=args.backend, seed=args.seed, itineraries=args.itineraries,
+        reservations=args.reservations, emails=args.emails, repeat=args.repeat, suites=suites,
+    )
+    records: List[Dict] = []
+    reports: Dict[str, Dict] = {}
+    if "api" in suites:
+        result = run_coroutine(run_api(args))
+        records.extend(result["records"])
+        meta["seed_s"] = result["seed_s"]
+    if "parsing" in suites:
+        records.extend(parsing.run(emails=max(args.emails, 2000), repeat=args.repeat, seed=args.seed))
+    if "parallel_parse" in suites:
+        reports["parallel_parse"] = parallel_parse.run(messages=10000, repeat=min(args.repeat, 3), seed=args.seed)
+    if "serialization" in suites:
+        reports["serialization"] = serialization.run(count=10000, repeat=args.repeat, seed=args.seed)
+    if "conflicts" in suites:
+        reports["conflicts"] = conflicts.run([1000, 10000, 50000], seed=args.seed)
+    if "date_parser" in suites:
+        reports["date_parser"] = date_parser.run(count=100000, seed=args.seed)
+
+    out = json.dumps({"meta": meta, "results": records, "reports": reports}, indent=2, default=str)
+    if args.output == "-":
+        print(out)
+    else:
+        with open(args.output, "w") as f:
+            f.write(out + "\n")
+        print(f"Wrote {len(records)} results to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Serialization Benchmark
+
+Compares the old list response path (FastAPI's jsonable_encoder walk then
+JSONResponse) with FastJSONResponse on synthetic reservation documents shaped
+like an email import (ObjectIds, datetimes, nested details).
+
+    python -m benchmarks.serialization [--count 10000] [--repeat 5] [--seed 7]
+
+Prints one JSON object with the best-of-N timing per path.
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from responses import FastJSONResponse
+
+from .generators import make_reservation_docs
+
+def to_out(doc: Dict) -> Dict:
+    doc = dict(doc)
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+def jsonable_path(docs: List[Dict]) -> bytes:
+    return JSONResponse(jsonable_encoder([to_out(d) for d in docs])).body
+
+
+def fast_path(docs: List[Dict]) -> bytes:
+    return FastJSONResponse([to_out(d) for d in docs]).body
+
+
+def best_of(fn: Callable[[List[Dict]], bytes], docs: List[Dict], repeat: int) -> Dict:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(fn(docs))
+        timings.append(time.perf_counter() - started)
+    return {"best_ms": round(min(timings) * 1000, 2), "bytes": size}
+
+
+def run(count: int = 10000, repeat: int = 5, seed: int = 7) -> Dict:
+    docs = make_reservation_docs(count, seed)
+    # Both paths must produce the same document
+    assert json.loads(jsonable_path(docs[:50])) == json.loads(fast_path(docs[:50]))
+    results = {
+        "benchmark": "serialization",
+        "count": count,
+        "repeat": repeat,
+        "seed": seed,
+        "jsonable_encoder": best_of(jsonable_path, docs, repeat),
+        "fast_json": best_of(fast_path, docs, repeat),
+    }
+    results["speedup"] = round(results["jsonable_encoder"]["best_ms"] / results["fast_json"]["best_ms"], 1)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(run(args.count, args.repeat, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
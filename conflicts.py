@@ -0,0 +1,101 @@
+"""
+Reservation Conflict Detection
+
+Sort-and-sweep over reservations ordered by start_time: each reservation is
+compared only with those still running when it starts, kept in a min-heap by
+end time, so a pass costs O(n log n + k) for k conflicts instead of comparing
+every pair. Documents are consumed one at a time, straight from an
+index-ordered cursor.
+
+Two lodgings that overlap are a double booking, and so are two non-lodging
+reservations (activities, flights, ...). A lodging overlapping an activity is
+the normal shape of a trip and is not reported. A reservation with no
+end_time is treated as an instant at its start time; one whose start_time is
+not a datetime (missing, or a raw string from an older import) is skipped.
+"""
+
+import heapq
+from datetime import datetime
+from typing import AsyncIterable, Dict, Iterable, List, Optional, Tuple
+
+CONFLICT_FIELDS = {"title": 1, "category": 1, "provider": 1, "start_time": 1, "end_time": 1}
+
+
+def conflict_kind(doc: Dict) -> str:
+    return "lodging" if doc.get("category") == "lodging" else "schedule"
+
+
+def _summary(doc: Dict) -> Dict:
+    return {
+        "id": str(doc["_id"]),
+        "title": doc.get("title"),
+        "category": doc.get("category"),
+        "provider": doc.get("provider"),
+        "start_time": doc.get("start_time"),
+        "end_time": doc.get("end_time"),
+    }
+
+
+class ConflictSweep:
+    """Incremental sweep; feed documents in (start_time, _id) order to add()"""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.count = 0
+        self.conflicts: List[Dict] = []
+        self._active: Dict[str, List[Tuple[datetime, datetime, int, Dict]]] = {}
+        self._seq = 0
+        self._last_start: Optional[datetime] = None
+
+    def add(self, doc: Dict) -> None:
+        start = doc.get("start_time")
+        if not isinstance(start, datetime):
+            return
+        if self._last_start is not None and start < self._last_start:
+            raise ValueError("Reservations must be fed in start_time order")
+        self._last_start = start
+        end = doc.get("end_time")
+        if not isinstance(end, datetime) or end < start:
+            end = start
+
+        heap = self._active.setdefault(conflict_kind(doc), [])
+        # Drop everything that finished before this one starts. An instant
+        # ending exactly now still clashes with another instant at the same
+        # time, so (end, start) ordering keeps those on the heap.
+        while heap and (heap[0][0] < start or (heap[0][0] == start and heap[0][1] < start)):
+            heapq.heappop(heap)
+
+        for other_end, _, _, other in heap:
+            self.count += 1
+            if self.limit is None or len(self.conflicts) < self.limit:
+                self.conflicts.append({
+                    "kind": conflict_kind(doc),
+                    "reservations": [_summary(other), _summary(doc)],
+                    "overlap_start": start,
+                    "overlap_end": min(end, other_end),
+                })
+        self._seq += 1
+        heapq.heappush(heap, (end, start, self._seq, doc))
+
+    def result(self) -> Dict:
+        return {
+            "count": self.count,
+            "truncated": self.limit is not None and self.count > len(self.conflicts),
+            "conflicts": self.conflicts,
+        }
+
+
+def find_conflicts(docs: Iterable[Dict], limit: Optional[int] = None) -> Dict:
+    """Conflicts among `docs`, which must already be sorted by start_time"""
+    sweep = ConflictSweep(limit)
+    for doc in docs:
+        sweep.add(doc)
+    return sweep.result()
+
+
+async def find_conflicts_async(cursor: AsyncIterable[Dict], limit: Optional[int] = None) -> Dict:
+    """find_conflicts over an async cursor, reading documents as they arrive"""
+    sweep = ConflictSweep(limit)
+    async for doc in cursor:
+        sweep.add(doc)
+    return sweep.result()
@@ -5,13 +5,23 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING
+from pymongo.errors import BulkWriteError
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
-from typing import Union
+from typing import Union, Iterable
 from pydantic import BaseModel
 
+from db_common import (
+    RESERVATION_INDEXES,
+    IMPORT_KEY_FIELDS,
+    client_options,
+    prepare_upserts,
+    plan_upserts,
+    finish_upserts,
+)
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -22,7 +32,7 @@ database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    _client = MongoClient(database_url, **client_options())
     db = _client[database_name]
 
 # Helper functions for common database operations
@@ -43,6 +53,69 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
     result = db[collection_name].insert_one(data_dict)
     return str(result.inserted_id)
 
+def create_documents(collection_name: str, items: Iterable[Union[BaseModel, dict]]):
+    """Insert many documents in one unordered batch with shared timestamps
+
+    Returns (inserted_ids, errors): inserted_ids is aligned with items and
+    holds None for each item that failed; errors lists {"index", "error"}.
+    """
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    now = datetime.now(timezone.utc)
+    docs = []
+    for item in items:
+        data_dict = item.model_dump() if isinstance(item, BaseModel) else item.copy()
+        data_dict['created_at'] = now
+        data_dict['updated_at'] = now
+        docs.append(data_dict)
+
+    if not docs:
+        return [], []
+
+    failed = {}
+    try:
+        db[collection_name].insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        failed = {err["index"]: err.get("errmsg", "write error") for err in e.details.get("writeErrors", [])}
+
+    inserted_ids = [None if i in failed else str(d["_id"]) for i, d in enumerate(docs)]
+    errors = [{"index": i, "error": msg} for i, msg in sorted(failed.items())]
+    return inserted_ids, errors
+
+def upsert_documents(collection_name: str, items: Iterable[Union[BaseModel, dict]], key_fields: tuple):
+    """Upsert documents keyed on key_fields in one bulk_write
+
+    Each document stores its content_hash; items whose hash matches the stored
+    document are reported "unchanged" and cost no write. Returns
+    (results, errors): results is aligned with items as {"status", "id"}
+    ("created" | "updated" | "unchanged" | "duplicate" | "failed"), errors
+    lists {"index", "error"}. A "duplicate" shares its key with a later item
+    of the same call, which is the one written; it carries that item's id
+    and index (duplicate_of).
+    """
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    docs, lookup, projection = prepare_upserts(items, key_fields)
+    if not docs:
+        return [], []
+
+    collection = db[collection_name]
+    existing = list(collection.find(lookup, projection))
+    results, ops, op_items = plan_upserts(docs, existing, key_fields)
+
+    upserted_ids, write_errors = {}, []
+    if ops:
+        try:
+            upserted_ids = collection.bulk_write(ops, ordered=False).upserted_ids
+        except BulkWriteError as e:
+            upserted_ids = {u["index"]: u["_id"] for u in e.details.get("upserted", [])}
+            write_errors = e.details.get("writeErrors", [])
+
+    errors = finish_upserts(results, op_items, upserted_ids, write_errors)
+    return results, errors
+
 def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
     """Get documents from collection"""
     if db is None:
@@ -53,3 +126,30 @@ def get_documents(collection_name: str, filter_dict: dict = None, limit: int = N
         cursor = cursor.limit(limit)
     
     return list(cursor)
+
+def iter_documents(collection_name: str, filter_dict: dict = None, sort: list = None, limit: int = None, projection: dict = None):
+    """Lazily iterate documents from collection without materializing them"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    cursor = db[collection_name].find(filter_dict or {}, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+
+    return cursor
+
+
+def ensure_indexes():
+    """Create the indexes used by the API (idempotent)"""
+    if db is None:
+        return
+
+    for keys in RESERVATION_INDEXES:
+        db["reservation"].create_index(keys)
+    db["reservation"].create_index(
+        [(f, ASCENDING) for f in IMPORT_KEY_FIELDS],
+        unique=True,
+        partialFilterExpression={"import_key": {"$exists": True}},
+    )
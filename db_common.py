@@ -0,0 +1,131 @@
+"""
+Shared Database Definitions
+
+Client settings, index definitions and upsert planning used by both the sync
+(database.py) and async (async_database.py) helpers. Nothing here opens a
+connection.
+"""
+
+from datetime import datetime, timezone
+import os
+import json
+import hashlib
+from typing import Union, Iterable
+from pymongo import ASCENDING, UpdateOne
+from pydantic import BaseModel
+
+from metrics import command_metrics
+
+
+def _env_int(name: str, default=None):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+def client_options() -> dict:
+    """MongoClient keyword arguments from the environment
+
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS and MONGO_COMPRESSORS (e.g. "zstd,zlib").
+    Command timing for /metrics is on unless MONGO_COMMAND_METRICS=0.
+    """
+    options = {
+        "maxPoolSize": _env_int("MONGO_MAX_POOL_SIZE", 100),
+        "minPoolSize": _env_int("MONGO_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": _env_int("MONGO_MAX_IDLE_TIME_MS"),
+        "serverSelectionTimeoutMS": _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        "connectTimeoutMS": _env_int("MONGO_CONNECT_TIMEOUT_MS", 5000),
+        "socketTimeoutMS": _env_int("MONGO_SOCKET_TIMEOUT_MS"),
+    }
+    compressors = os.getenv("MONGO_COMPRESSORS")
+    if compressors:
+        options["compressors"] = compressors
+    if os.getenv("MONGO_COMMAND_METRICS", "1") != "0":
+        options["event_listeners"] = [command_metrics]
+    return {k: v for k, v in options.items() if v is not None}
+
+# Compound indexes backing the reservation list filters and the
+# (start_time, _id) keyset sort. create_index is a
+# no-op when an index with the same keys and options already exists, so this
+# is safe to run on every startup.
+RESERVATION_INDEXES = [
+    [("itinerary_id", ASCENDING), ("start_time", ASCENDING), ("_id", ASCENDING)],
+    [("itinerary_id", ASCENDING), ("category", ASCENDING), ("start_time", ASCENDING), ("_id", ASCENDING)],
+    [("itinerary_id", ASCENDING), ("provider", ASCENDING), ("start_time", ASCENDING), ("_id", ASCENDING)],
+    [("itinerary_id", ASCENDING), ("search_tokens", ASCENDING)],
+]
+
+# Imports upsert on this key; documents created by hand have no import_key
+# and are left out of the unique constraint.
+IMPORT_KEY_FIELDS = ("itinerary_id", "provider", "import_key")
+
+# provider_updated_at only drives delta sync; a bump without a content change
+# should not rewrite the document
+HASH_EXCLUDED_FIELDS = {"_id", "created_at", "updated_at", "content_hash", "provider_updated_at"}
+
+def content_hash(data: dict) -> str:
+    """Stable hash of a document's content, ignoring bookkeeping fields"""
+    content = {k: v for k, v in data.items() if k not in HASH_EXCLUDED_FIELDS}
+    raw = json.dumps(content, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def prepare_upserts(items: Iterable[Union[BaseModel, dict]], key_fields: tuple):
+    """Hash items and build the query for their stored counterparts"""
+    docs = []
+    for item in items:
+        data_dict = item.model_dump() if isinstance(item, BaseModel) else item.copy()
+        data_dict['content_hash'] = content_hash(data_dict)
+        docs.append(data_dict)
+
+    keys = {tuple(d.get(f) for f in key_fields) for d in docs}
+    lookup = {"$or": [dict(zip(key_fields, k)) for k in keys]}
+    projection = {f: 1 for f in (*key_fields, "content_hash")}
+    return docs, lookup, projection
+
+def plan_upserts(docs: list, existing: list, key_fields: tuple):
+    """Decide per item whether it is created, updated, unchanged or a duplicate
+
+    An item whose key appears again later in the same batch is a "duplicate":
+    only the last one is written, and finish_upserts gives the earlier ones
+    its id (duplicate_of is its index). Returns (results, ops, op_items);
+    op_items maps each op back to its item.
+    """
+    def key_of(d):
+        return tuple(d.get(f) for f in key_fields)
+
+    now = datetime.now(timezone.utc)
+    stored = {key_of(doc): doc for doc in existing}
+    last_index = {key_of(d): i for i, d in enumerate(docs)}
+    results, ops, op_items = [None] * len(docs), [], []
+    for i, d in enumerate(docs):
+        key = key_of(d)
+        current = stored.get(key)
+        current_id = str(current["_id"]) if current else None
+        if last_index[key] != i:
+            results[i] = {"status": "duplicate", "id": None, "duplicate_of": last_index[key]}
+            continue
+        if current and current.get("content_hash") == d['content_hash']:
+            results[i] = {"status": "unchanged", "id": current_id}
+            continue
+        d['updated_at'] = now
+        ops.append(UpdateOne(dict(zip(key_fields, key)), {"$set": d, "$setOnInsert": {"created_at": now}}, upsert=True))
+        op_items.append(i)
+        results[i] = {"status": "updated" if current else "created", "id": current_id}
+    return results, ops, op_items
+
+def finish_upserts(results: list, op_items: list, upserted_ids: dict, write_errors: list):
+    """Fold a bulk_write outcome into the per-item results; returns errors"""
+    for op_index, _id in upserted_ids.items():
+        results[op_items[op_index]]["id"] = str(_id)
+
+    errors = []
+    for err in write_errors:
+        i = op_items[err["index"]]
+        results[i] = {"status": "failed", "id": None}
+        errors.append({"index": i, "error": err.get("errmsg", "write error")})
+    errors.sort(key=lambda e: e["index"])
+
+    for result in results:
+        if result["status"] == "duplicate":
+            result["id"] = results[result["duplicate_of"]]["id"]
+    return errors
@@ -0,0 +1,355 @@
+"""
+Reservation Import Pipeline
+
+Shared by the import endpoints and background import jobs: imported items
+are keyed, indexed for search and upserted batch by batch as they come out of
+the fetch/parse stages, so an import never holds more than a few batches in
+memory.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from async_database import get_db, upsert_documents, IMPORT_KEY_FIELDS
+from db_common import content_hash
+from metrics import IMPORT_EMAILS_PARSED, IMPORT_ITEMS
+from providers.base import ProviderNotConfigured, as_datetime
+from search import with_search_tokens
+from versions import bump, itinerary_key
+
+logger = logging.getLogger(__name__)
+
+# Write batch size. Email parsing reads larger windows when the parse pool
+# is enabled (providers.gmail.parse_window)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+# Batches the fetch/parse stage may run ahead of the database writes
+IMPORT_PREFETCH_BATCHES = int(os.getenv("IMPORT_PREFETCH_BATCHES", "2"))
+# Sync-all fan-out: connectors fetched at once, and per-connector fetch budget
+SYNC_CONCURRENCY = int(os.getenv("PROVIDER_SYNC_CONCURRENCY", "4"))
+SYNC_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_SYNC_TIMEOUT_SECONDS", "30"))
+
+
+SUPPORTED_PROVIDERS: Dict[str, str] = {
+    "booking.com": "providers.booking",
+    "agoda": "providers.agoda",
+    "viator": "providers.viator",
+    "klook": "providers.klook",
+    "getyourguide": "providers.getyourguide",
+}
+
+# Called after each saved batch with that batch's summary
+BatchCallback = Callable[[Dict], Awaitable[None]]
+
+
+class ImportSourceError(Exception):
+    """The fetch/parse stage of an import failed"""
+
+
+class ImportTimeoutError(ImportSourceError):
+    """A provider fetch did not finish within its timeout"""
+
+
+class ConnectorLoadError(Exception):
+    """A provider connector module could not be imported"""
+
+
+class AccountNotFound(Exception):
+    """The connected account for a sync does not exist or is for another provider"""
+
+
+def import_key(item: Dict) -> str:
+    """Natural key of an imported booking within its itinerary and provider.
+
+    Falls back to a content hash when there is no trustworthy confirmation
+    number. API connectors return real ones. Numbers scraped from email are
+    heuristic (e.g. "Confirmation number: BK-1" yields "number"), so they
+    only count when they contain a digit.
+    """
+    confirmation = item.get("confirmation_number")
+    if confirmation and (item.get("source") != "email" or any(c.isdigit() for c in str(confirmation))):
+        return str(confirmation)
+    return "hash:" + content_hash(item)
+
+
+async def save_import_items(itinerary_id: str, fetched: List[Dict]):
+    """Upsert imported reservations; returns (counts, items, failed).
+
+    Items repeating an earlier item's key within the batch are counted as
+    "duplicate"; the last of them is the one saved.
+    """
+    rows = [{**item, "itinerary_id": itinerary_id} for item in fetched]
+    for r in rows:
+        r["import_key"] = import_key(r)
+    counts = {"created": 0, "updated": 0, "unchanged": 0, "duplicate": 0}
+    try:
+        results, failed = await upsert_documents("reservation", [with_search_tokens(r) for r in rows], IMPORT_KEY_FIELDS)
+    except Exception as e:
+        return counts, [], [{"index": i, "error": str(e)[:120]} for i in range(len(rows))]
+
+    items = []
+    for data, result in zip(rows, results):
+        if result["status"] in counts:
+            counts[result["status"]] += 1
+            data["id"] = result["id"]
+            data["status"] = result["status"]
+            items.append(data)
+    return counts, items, failed
+
+
+async def prefetch(batches: Iterator[List[Dict]], maxsize: int = IMPORT_PREFETCH_BATCHES) -> AsyncIterator[List[Dict]]:
+    """Drive a blocking batch iterator from a worker thread.
+
+    At most `maxsize` batches are buffered ahead of the consumer, so parsing
+    the next batch overlaps with writing the current one without letting the
+    producer run away. Producer failures surface as ImportSourceError.
+    """
+    done = object()
+    queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    async def produce():
+        try:
+            while True:
+                batch = await run_in_threadpool(next, batches, done)
+                await queue.put(batch)
+                if batch is done:
+                    return
+        except Exception as e:
+            await queue.put(ImportSourceError(str(e)))
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            batch = await queue.get()
+            if batch is done:
+                return
+            if isinstance(batch, ImportSourceError):
+                raise batch
+            yield batch
+    finally:
+        producer.cancel()
+
+
+async def as_batches(items: Iterable[Dict], size: int = IMPORT_BATCH_SIZE) -> AsyncIterator[List[Dict]]:
+    """Split an already-fetched list into write batches"""
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+async def save_batches(
+    itinerary_id: str,
+    batches: AsyncIterator[List[Dict]],
+    on_batch: Optional[BatchCallback] = None,
+    keep_items: bool = True,
+    source: str = "provider",
+) -> Dict:
+    """Upsert batches as they arrive; failed indexes are relative to the whole stream"""
+    totals = {"created": 0, "updated": 0, "unchanged": 0, "duplicate": 0}
+    items: List[Dict] = []
+    failed: List[Dict] = []
+    offset = 0
+    async for batch in batches:
+        counts, saved, batch_failed = await save_import_items(itinerary_id, batch)
+        for k in totals:
+            totals[k] += counts[k]
+            IMPORT_ITEMS.inc(counts[k], source, k)
+        IMPORT_ITEMS.inc(len(batch_failed), source, "failed")
+        if keep_items:
+            items.extend(saved)
+        batch_failed = [{**f, "index": f["index"] + offset} for f in batch_failed]
+        failed.extend(batch_failed)
+        offset += len(batch)
+        if counts["created"] or counts["updated"]:
+            # Bumped per batch so pollers see a long import's progress
+            await bump(itinerary_key(itinerary_id))
+        if on_batch is not None:
+            await on_batch({**counts, "processed": len(batch), "failed": batch_failed})
+    return {**totals, "failed": failed, "items": items}
+
+
+def load_connector(provider_key: str):
+    try:
+        return importlib.import_module(SUPPORTED_PROVIDERS[provider_key])
+    except Exception as e:
+        raise ConnectorLoadError(str(e))
+
+
+async def import_from_provider(
+    itinerary_id: str,
+    provider_key: str,
+    account: Dict,
+    on_batch: Optional[BatchCallback] = None,
+    keep_items: bool = True,
+    timeout: Optional[float] = None,
+    since: Optional[datetime] = None,
+) -> Dict:
+    """Fetch a provider's reservations and upsert them into the itinerary.
+
+    With `since`, the connector only returns bookings changed after it. The
+    result's sync_cursor is the newest provider_updated_at fetched (or
+    `since` when nothing changed). `timeout` bounds the connector fetch only;
+    a timed-out fetch saves nothing.
+    """
+    connector = load_connector(provider_key)
+    try:
+        fetched: List[Dict] = await asyncio.wait_for(
+            run_in_threadpool(connector.fetch_reservations, account, since=since), timeout
+        )
+    except asyncio.TimeoutError:
+        raise ImportTimeoutError(f"No response within {timeout:g}s")
+    except Exception as e:
+        raise ImportSourceError(str(e)) from e
+
+    stamps = [as_datetime(item.get("provider_updated_at")) for item in fetched]
+    cursor = max([s for s in stamps if s is not None] + ([since] if since else []), default=None)
+    result = await save_batches(itinerary_id, as_batches(fetched), on_batch, keep_items)
+    return {**result, "fetched": len(fetched), "sync_cursor": cursor}
+
+
+async def load_account(account_id: str, provider_key: str) -> Dict:
+    try:
+        oid = ObjectId(account_id)
+    except (InvalidId, TypeError):
+        raise AccountNotFound("Invalid account id")
+    account = await get_db()["account"].find_one({"_id": oid, "provider": provider_key})
+    if account is None:
+        raise AccountNotFound(f"No {provider_key} account {account_id}")
+    return account
+
+
+async def sync_account(
+    itinerary_id: str,
+    provider_key: str,
+    credentials: Dict,
+    account_id: Optional[str] = None,
+    full_resync: bool = False,
+    on_batch: Optional[BatchCallback] = None,
+    keep_items: bool = True,
+    timeout: Optional[float] = None,
+) -> Dict:
+    """Import from a provider, incrementally when a connected account is given.
+
+    The account's sync_cursor (provider clock) bounds the fetch unless
+    `full_resync` is set or the cursor was recorded for another itinerary.
+    After a successful run the new cursor and last_sync_at are stored on the
+    account; a failed run leaves them untouched so the next sync retries.
+    """
+    if account_id is None:
+        result = await import_from_provider(
+            itinerary_id, provider_key, credentials, on_batch, keep_items, timeout
+        )
+        return {**result, "mode": "full"}
+
+    account = await load_account(account_id, provider_key)
+    since = None
+    if not full_resync and account.get("sync_itinerary_id") == itinerary_id:
+        since = as_datetime(account.get("sync_cursor"))
+
+    try:
+        result = await import_from_provider(
+            itinerary_id, provider_key, credentials, on_batch, keep_items, timeout, since=since
+        )
+    except ImportSourceError:
+        await get_db()["account"].update_one(
+            {"_id": account["_id"]},
+            {"$set": {"status": "error", "updated_at": datetime.now(timezone.utc)}},
+        )
+        raise
+
+    update = {
+        "status": "connected",
+        "last_sync_at": datetime.now(timezone.utc),
+        "sync_itinerary_id": itinerary_id,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    # Items that failed to save must be fetched again, so the cursor only
+    # moves when every fetched item landed
+    if result["sync_cursor"] is not None and not result["failed"]:
+        update["sync_cursor"] = result["sync_cursor"].isoformat()
+    await get_db()["account"].update_one({"_id": account["_id"]}, {"$set": update})
+    return {**result, "mode": "delta" if since else "full"}
+
+
+async def sync_providers(
+    itinerary_id: str,
+    accounts: Dict[str, Dict],
+    timeout: float = SYNC_TIMEOUT_SECONDS,
+    concurrency: int = SYNC_CONCURRENCY,
+    account_ids: Optional[Dict[str, str]] = None,
+    full_resync: bool = False,
+) -> Dict[str, Dict]:
+    """Import from several providers concurrently; returns a result per provider.
+
+    At most `concurrency` connectors run at once and each fetch gets `timeout`
+    seconds, so the whole sync takes about as long as the slowest provider.
+    One provider failing, for whatever reason, never fails the others: each
+    result carries its own status ("ok", "not_configured", "timeout" or
+    "error"). Providers listed
+    in `account_ids` sync incrementally as in sync_account.
+    """
+    account_ids = account_ids or {}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def sync_one(provider_key: str) -> Dict:
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                result = await sync_account(
+                    itinerary_id, provider_key, accounts[provider_key],
+                    account_id=account_ids.get(provider_key), full_resync=full_resync,
+                    keep_items=False, timeout=timeout,
+                )
+                outcome = {"status": "ok", **result}
+            except ImportTimeoutError as e:
+                outcome = {"status": "timeout", "error": str(e)}
+            except ImportSourceError as e:
+                status = "not_configured" if isinstance(e.__cause__, ProviderNotConfigured) else "error"
+                outcome = {"status": status, "error": str(e)[:120]}
+            except ConnectorLoadError as e:
+                outcome = {"status": "error", "error": f"Connector load error: {str(e)[:120]}"}
+            except AccountNotFound as e:
+                outcome = {"status": "error", "error": str(e)}
+            except Exception as e:
+                # e.g. a database error loading the account or saving items:
+                # reported for this provider only, the others still finish
+                logger.exception("Sync of %s failed", provider_key)
+                outcome = {"status": "error", "error": str(e)[:120]}
+            outcome.pop("items", None)
+            outcome["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+            return outcome
+
+    results = await asyncio.gather(*(sync_one(key) for key in accounts))
+    return dict(zip(accounts, results))
+
+
+async def import_from_email(
+    itinerary_id: str,
+    account: Dict,
+    provider_hint: Optional[str] = None,
+    raw_messages: Optional[List[Dict]] = None,
+    on_batch: Optional[BatchCallback] = None,
+    keep_items: bool = True,
+) -> Dict:
+    """Fetch and parse mailbox messages and upsert the reservations found"""
+    from providers.email_import import iter_gmail_reservation_batches
+
+    batches = iter_gmail_reservation_batches(
+        account,
+        provider_hint=provider_hint,
+        raw_messages=raw_messages,
+        batch_size=IMPORT_BATCH_SIZE,
+        on_parsed=IMPORT_EMAILS_PARSED.inc,
+    )
+    # Parsing is CPU-bound and runs in a worker thread, one batch ahead of
+    # the inserts
+    return await save_batches(itinerary_id, prefetch(batches), on_batch, keep_items, source="email")
@@ -0,0 +1,237 @@
+"""
+Background Import Jobs
+
+Long imports run outside the HTTP request: submit() records a job in the
+"import_job" collection and hands its id to an in-process queue drained by a
+small pool of asyncio workers. Job state (status, progress, counts) lives in
+Mongo, so it can be polled from any process and survives restarts: queued
+jobs, and running jobs whose heartbeat went stale, are picked up again at
+startup and periodically after. A running job's updated_at is refreshed by a
+heartbeat, so only jobs whose process is gone go stale. Each claim stamps a
+run_id that every later write of that run is conditioned on, so a run that
+lost its claim cannot touch the job again. Imports are idempotent upserts, so
+re-running a job is safe.
+
+Payloads are stored so a job can be re-run, which means they are bounded
+(JOB_MAX_PAYLOAD_BYTES, well under Mongo's 16 MB document limit) and the
+fields a runner registers as secret (access tokens) are removed from the
+document once the job finishes.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import bson
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+
+from async_database import create_document, get_db
+
+logger = logging.getLogger(__name__)
+
+JOB_COLLECTION = "import_job"
+JOB_WORKERS = int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+# A running job not updated for this long is assumed orphaned by a restart
+JOB_STALE_SECONDS = int(os.getenv("IMPORT_JOB_STALE_SECONDS", "300"))
+# How often a running job refreshes updated_at; well inside the stale window
+JOB_HEARTBEAT_SECONDS = float(os.getenv("IMPORT_JOB_HEARTBEAT_SECONDS", "0")) or JOB_STALE_SECONDS / 3
+# Failed-item entries kept on the job document (failed_count is exact)
+JOB_MAX_FAILED_ENTRIES = 100
+JOB_MAX_PAYLOAD_BYTES = int(os.getenv("IMPORT_JOB_MAX_PAYLOAD_BYTES", str(8 * 1024 * 1024)))
+
+# runner(payload, on_batch) -> final import summary
+JobRunner = Callable[[Dict, Callable[[Dict], Awaitable[None]]], Awaitable[Dict]]
+
+_runners: Dict[str, JobRunner] = {}
+_secret_fields: Dict[str, tuple] = {}
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+_active: set = set()
+# Ids put on the local queue and not yet through a run attempt
+_enqueued: set = set()
+
+
+class PayloadTooLarge(ValueError):
+    """A job payload is over JOB_MAX_PAYLOAD_BYTES once BSON-encoded"""
+
+    def __init__(self, size: int):
+        super().__init__(f"Job payload is {size} bytes; the limit is {JOB_MAX_PAYLOAD_BYTES}")
+        self.size = size
+
+
+def register(kind: str, runner: JobRunner, secret_fields: Iterable[str] = ()) -> None:
+    """Register the runner for `kind`; `secret_fields` are top-level payload
+    fields dropped from the stored job when it finishes"""
+    _runners[kind] = runner
+    _secret_fields[kind] = tuple(secret_fields)
+
+
+async def submit(kind: str, payload: Dict) -> str:
+    """Persist a queued job and schedule it; returns the job id"""
+    if kind not in _runners:
+        raise ValueError(f"Unknown job kind: {kind}")
+    size = len(bson.encode(payload))
+    if size > JOB_MAX_PAYLOAD_BYTES:
+        raise PayloadTooLarge(size)
+    job_id = await create_document(JOB_COLLECTION, {
+        "kind": kind,
+        "payload": payload,
+        "status": "queued",
+        "processed": 0,
+        "created": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "duplicate": 0,
+        "failed_count": 0,
+        "failed": [],
+        "error": None,
+    })
+    if _queue is not None:
+        _enqueue(job_id)
+    return job_id
+
+
+async def get_job(job_id: str) -> Optional[Dict]:
+    """Job status without its payload, or None if unknown"""
+    try:
+        oid = ObjectId(job_id)
+    except (InvalidId, TypeError):
+        return None
+    doc = await get_db()[JOB_COLLECTION].find_one({"_id": oid}, {"payload": 0, "run_id": 0})
+    if doc is not None:
+        doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+async def _requeue_pending() -> None:
+    collection = get_db()[JOB_COLLECTION]
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=JOB_STALE_SECONDS)
+    # Jobs running here are alive whatever their timestamp says
+    await collection.update_many(
+        {"status": "running", "updated_at": {"$lt": stale_before},
+         "_id": {"$nin": [ObjectId(j) for j in _active]}},
+        {"$set": {"status": "queued"}},
+    )
+    async for doc in collection.find({"status": "queued"}, {"_id": 1}).sort("_id", 1):
+        _enqueue(str(doc["_id"]))
+
+
+def _enqueue(job_id: str) -> None:
+    # Each reaper pass sees the whole backlog; ids already waiting or running
+    # here are skipped so the local queue does not grow by it every time
+    if job_id not in _enqueued:
+        _enqueued.add(job_id)
+        _queue.put_nowait(job_id)
+
+
+async def _reaper() -> None:
+    while True:
+        await asyncio.sleep(JOB_STALE_SECONDS)
+        try:
+            await _requeue_pending()
+        except Exception:
+            logger.exception("Requeueing import jobs failed")
+
+
+async def start() -> None:
+    """Start the worker pool and requeue jobs left over from a previous run"""
+    global _queue
+    if get_db() is None:
+        return
+    _queue = asyncio.Queue()
+    await _requeue_pending()
+    _workers.extend(asyncio.create_task(_worker()) for _ in range(JOB_WORKERS))
+    _workers.append(asyncio.create_task(_reaper()))
+
+
+async def stop() -> None:
+    """Cancel the workers and hand their in-flight jobs back to the queue"""
+    global _queue
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    if _active and get_db() is not None:
+        await get_db()[JOB_COLLECTION].update_many(
+            {"_id": {"$in": [ObjectId(j) for j in _active]}, "status": "running"},
+            {"$set": {"status": "queued"}},
+        )
+    _active.clear()
+    _enqueued.clear()
+    _queue = None
+
+
+async def _worker() -> None:
+    while True:
+        job_id = await _queue.get()
+        try:
+            await _run(job_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Import job %s crashed", job_id)
+        finally:
+            _enqueued.discard(job_id)
+
+
+async def _heartbeat(collection, fence: Dict) -> None:
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+        try:
+            await collection.update_one(fence, {"$set": {"updated_at": datetime.now(timezone.utc)}})
+        except Exception:
+            logger.exception("Import job heartbeat failed")
+
+
+async def _run(job_id: str) -> None:
+    collection = get_db()[JOB_COLLECTION]
+    oid = ObjectId(job_id)
+    run_id = ObjectId()
+    now = datetime.now(timezone.utc)
+    # Claim atomically so a job is only ever run by one worker
+    job = await collection.find_one_and_update(
+        {"_id": oid, "status": "queued"},
+        {"$set": {"status": "running", "run_id": run_id, "started_at": now, "updated_at": now,
+                  "processed": 0, "created": 0, "updated": 0, "unchanged": 0,
+                  "duplicate": 0, "failed_count": 0, "failed": []}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if job is None:
+        return
+    _active.add(job_id)
+    fence = {"_id": oid, "run_id": run_id}
+    heartbeat = asyncio.create_task(_heartbeat(collection, fence))
+
+    async def on_batch(summary: Dict) -> None:
+        await collection.update_one(fence, {
+            "$inc": {
+                "processed": summary["processed"],
+                "created": summary["created"],
+                "updated": summary["updated"],
+                "unchanged": summary["unchanged"],
+                "duplicate": summary["duplicate"],
+                "failed_count": len(summary["failed"]),
+            },
+            "$push": {"failed": {"$each": summary["failed"], "$slice": JOB_MAX_FAILED_ENTRIES}},
+            "$set": {"updated_at": datetime.now(timezone.utc)},
+        })
+
+    try:
+        await _runners[job["kind"]](job["payload"], on_batch)
+    except Exception as e:
+        status, error = "failed", str(e)[:500]
+    else:
+        status, error = "succeeded", None
+    finally:
+        heartbeat.cancel()
+    _active.discard(job_id)
+    now = datetime.now(timezone.utc)
+    update = {"$set": {"status": status, "error": error, "finished_at": now, "updated_at": now}}
+    secrets = _secret_fields.get(job["kind"])
+    if secrets:
+        update["$unset"] = {f"payload.{f}": "" for f in secrets}
+    await collection.update_one(fence, update)
@@ -1,14 +1,103 @@
+import asyncio
+import hmac
+import logging
 import os
+import re
+from urllib.parse import urlencode
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Literal
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-
-from database import db, create_document, get_documents
-
-app = FastAPI(title="Trip Itinerary Aggregator API")
+from pydantic import BaseModel, Field
+
+from async_database import (
+    connect,
+    close,
+    get_db,
+    ping,
+    create_document,
+    iter_documents,
+    ensure_indexes,
+)
+from responses import FastJSONResponse
+from pagination import InvalidCursor, keyset_filter, sort_spec, take_page, ndjson_lines
+from cache import TTLCache, MISSING
+import metrics
+import profiling
+from providers.base import close_sessions
+from providers.gmail import shutdown_parse_pool
+from importer import (
+    SUPPORTED_PROVIDERS,
+    ConnectorLoadError,
+    AccountNotFound,
+    ImportSourceError,
+    SYNC_CONCURRENCY,
+    SYNC_TIMEOUT_SECONDS,
+    import_from_email as import_from_email_source,
+    load_account,
+    sync_account,
+    sync_providers,
+)
+import jobs
+from versions import ITINERARIES_KEY, bump, etag_matches, get_version, itinerary_key, make_etag
+from conflicts import CONFLICT_FIELDS, find_conflicts_async
+from timeline import InvalidTimezone, build_timeline
+from search import with_search_tokens, build_search_clauses, candidate_limit, rank, backfill_search_tokens
+
+HEALTH_TIMEOUT_SECONDS = float(os.getenv("HEALTH_TIMEOUT_SECONDS", "1.0"))
+
+logger = logging.getLogger(__name__)
+
+# Index builds can take minutes on a large collection, so they run after the
+# server starts accepting requests; /readyz reports "starting" until this
+# task finishes. The search backfill follows in its own task and does not
+# gate readiness: reservations it has not reached yet are only missing from
+# q results.
+startup_task: Optional[asyncio.Task] = None
+backfill_task: Optional[asyncio.Task] = None
+
+
+async def prepare_database(db) -> None:
+    global backfill_task
+    await ensure_indexes()
+    # Imports rely on the unique import-key index, so jobs start after it
+    await jobs.start()
+    if db is not None:
+        backfill_task = asyncio.create_task(backfill_search_tokens(db["reservation"]))
+        backfill_task.add_done_callback(log_task_failure("Search token backfill failed"))
+
+
+def log_task_failure(message: str):
+    def callback(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(message, exc_info=task.exception())
+    return callback
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global startup_task
+    db = connect()
+    startup_task = asyncio.create_task(prepare_database(db))
+    startup_task.add_done_callback(log_task_failure("Database startup failed"))
+    yield
+    startup_task.cancel()
+    await asyncio.gather(startup_task, return_exceptions=True)
+    # Read after startup settles: it is what starts the backfill
+    if backfill_task is not None:
+        backfill_task.cancel()
+        await asyncio.gather(backfill_task, return_exceptions=True)
+    await jobs.stop()
+    shutdown_parse_pool()
+    close_sessions()
+    close()
+
+
+app = FastAPI(title="Trip Itinerary Aggregator API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,7 +105,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Browsers hide response headers from scripts unless they are listed here
+    expose_headers=["X-Next-Cursor", "X-Truncated", "ETag"],
 )
+# Opt-in: only installed when PROFILE_TOKEN or PROFILE_SAMPLE_RATE is set
+if profiling.enabled():
+    app.add_middleware(profiling.ProfilingMiddleware)
+# Added last so it is outermost and times the whole request
+app.add_middleware(metrics.MetricsMiddleware)
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 
 
 class ItineraryIn(BaseModel):
@@ -45,12 +143,13 @@ class ReservationIn(BaseModel):
 
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Trip Itinerary Aggregator Backend"}
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
+    db = get_db()
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -66,7 +165,7 @@ def test_database():
             response["database_name"] = db.name if hasattr(db, "name") else "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = await db.list_collection_names()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
@@ -80,109 +179,416 @@ def test_database():
     return response
 
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and the database answers a ping in time"""
+    if not await ping(HEALTH_TIMEOUT_SECONDS):
+        return JSONResponse(status_code=503, content={"status": "unavailable"})
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: index setup finished, jobs started and the database answers"""
+    if startup_task is None or not startup_task.done():
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    if startup_task.cancelled() or startup_task.exception() is not None:
+        return JSONResponse(status_code=503, content={"status": "startup_failed"})
+    if not await ping(HEALTH_TIMEOUT_SECONDS):
+        return JSONResponse(status_code=503, content={"status": "unavailable"})
+    return {"status": "ready"}
+
+
+# ------------------- Listing helpers -------------------
+MAX_PAGE_SIZE = 1000
+
+
+def to_out(doc: Dict) -> Dict:
+    doc["id"] = str(doc.pop("_id", ""))
+    doc.pop("search_tokens", None)
+    return doc
+
+
+# Fields a `fields=` projection may name (dotted paths into these are allowed),
+# and the field lists behind view=compact
+ITINERARY_FIELDS = set(ItineraryIn.model_fields) | {"created_at", "updated_at"}
+RESERVATION_FIELDS = set(ReservationIn.model_fields) | {"created_at", "updated_at", "import_key", "provider_updated_at"}
+COMPACT_ITINERARY_FIELDS = ["name", "start_date", "end_date"]
+COMPACT_RESERVATION_FIELDS = ["title", "category", "provider", "location", "start_time", "end_time"]
+
+
+def requested_fields(fields: Optional[str], view: str, allowed: set, compact: List[str]) -> Optional[List[str]]:
+    """Output fields asked for by `fields=`/`view=`, or None for full documents.
+
+    `id` is always returned, so naming it is accepted and needs no projection.
+    """
+    if not fields:
+        return compact if view == "compact" else None
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip() and f.strip() != "id"))
+    unknown = [n for n in names if n.split(".")[0] not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # A parent path already covers its children (and Mongo rejects both)
+    return [n for n in names if not any(n.startswith(p + ".") for p in names)]
+
+
+def build_projection(names: Optional[List[str]], required: tuple = ()):
+    """Mongo projection for `names`, plus output transform.
+
+    `required` fields are needed internally (cursor encoding, ranking); they
+    are fetched even if not requested and dropped again before output.
+    """
+    if names is None:
+        projection = None if "search_tokens" in required else {"search_tokens": 0}
+        return projection, to_out
+    drop = [f for f in required if f not in names]
+    # An empty projection would mean "all fields"; `fields=id` wants only _id
+    projection = {f: 1 for f in [*names, *drop]} or {"_id": 1}
+    if not drop:
+        return projection, to_out
+
+    def transform(doc: Dict) -> Dict:
+        for f in drop:
+            doc.pop(f, None)
+        return to_out(doc)
+    return projection, transform
+
+
+def cursor_filter(after: Optional[str], sort_field: Optional[str] = None) -> Dict:
+    if not after:
+        return {}
+    try:
+        return keyset_filter(after, sort_field)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def page_fetch_limit(limit: Optional[int], format: str) -> Optional[int]:
+    # JSON pages read one extra document to know whether a next page exists
+    if limit and format == "json":
+        return limit + 1
+    return limit
+
+
+async def check_version(request: Request, key: str):
+    """ETag of this request's view at the current version of `key`.
+
+    Returns (etag, response): response is a 304 when If-None-Match already
+    names the etag, so the caller can return it without querying documents.
+    """
+    version = await get_version(key)
+    variant = urlencode(sorted(request.query_params.multi_items()))
+    etag = make_etag(key, version, variant)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return etag, Response(status_code=304, headers={"ETag": etag})
+    return etag, None
+
+
+async def list_response(
+    docs,
+    limit: Optional[int],
+    format: str,
+    sort_field: Optional[str] = None,
+    etag: Optional[str] = None,
+    transform=to_out,
+):
+    """Serialize a cursor as a JSON page (X-Next-Cursor header) or NDJSON stream"""
+    headers = {"ETag": etag} if etag else {}
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(docs, transform), media_type="application/x-ndjson", headers=headers)
+    if limit:
+        docs, next_cursor = await take_page(docs, limit, sort_field)
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+    if not isinstance(docs, list):
+        docs = await docs.to_list(length=None)
+    # Returned as a response object so FastAPI's jsonable_encoder pass is skipped
+    return FastJSONResponse([transform(d) for d in docs], headers=headers)
+
+
 # ------------------- Itineraries -------------------
+# Known itinerary ids; missing ids are remembered briefly so a burst of
+# requests for a bad id doesn't hit the database each time.
+itinerary_cache = TTLCache(
+    maxsize=int(os.getenv("ITINERARY_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("ITINERARY_CACHE_TTL", "300")),
+)
+ITINERARY_CACHE_NEGATIVE_TTL = float(os.getenv("ITINERARY_CACHE_NEGATIVE_TTL", "5"))
+
+
+async def require_itinerary(itinerary_id: str) -> None:
+    """Raise 400 for a malformed id and 404 for an unknown itinerary"""
+    from bson import ObjectId
+    from bson.errors import InvalidId
+
+    exists = itinerary_cache.get(itinerary_id)
+    if exists is MISSING:
+        try:
+            oid = ObjectId(itinerary_id)
+        except (InvalidId, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid itinerary_id")
+        exists = await get_db()["itinerary"].find_one({"_id": oid}, {"_id": 1}) is not None
+        itinerary_cache.set(itinerary_id, exists, ttl=None if exists else ITINERARY_CACHE_NEGATIVE_TTL)
+    if not exists:
+        raise HTTPException(status_code=404, detail="Itinerary not found")
+
+
+def invalidate_itinerary(itinerary_id: str) -> None:
+    """Forget cached existence for an itinerary (call after create/delete)"""
+    itinerary_cache.invalidate(itinerary_id)
+
+
+# Timelines keyed by their ETag, which carries the itinerary's version, so a
+# reservation write makes the old entry unreachable
+timeline_cache = TTLCache(
+    maxsize=int(os.getenv("TIMELINE_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("TIMELINE_CACHE_TTL", "600")),
+)
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    return {"itinerary": itinerary_cache.stats(), "timeline": timeline_cache.stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.post("/api/itineraries")
-def create_itinerary(payload: ItineraryIn):
+async def create_itinerary(payload: ItineraryIn):
     data = payload.model_dump()
-    inserted_id = create_document("itinerary", data)
+    inserted_id = await create_document("itinerary", data)
+    invalidate_itinerary(inserted_id)
+    await bump(ITINERARIES_KEY)
     return {"id": inserted_id, **data}
 
 
 @app.get("/api/itineraries")
-def list_itineraries():
-    docs = get_documents("itinerary")
-    for d in docs:
-        d["id"] = str(d.pop("_id", ""))
-    return docs
+async def list_itineraries(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    format: Literal["json", "ndjson"] = Query("json"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    view: Literal["full", "compact"] = Query("full"),
+):
+    names = requested_fields(fields, view, ITINERARY_FIELDS, COMPACT_ITINERARY_FIELDS)
+    etag, not_modified = await check_version(request, ITINERARIES_KEY)
+    if not_modified:
+        return not_modified
+
+    projection, transform = build_projection(names)
+    filters = cursor_filter(after)
+    docs = iter_documents("itinerary", filters, sort=sort_spec(), limit=page_fetch_limit(limit, format), projection=projection)
+    return await list_response(docs, limit, format, etag=etag, transform=transform)
 
 
 # ------------------- Reservations -------------------
 @app.post("/api/reservations")
-def add_reservation(payload: ReservationIn):
+async def add_reservation(payload: ReservationIn):
     # ensure itinerary exists
-    from bson import ObjectId
-    try:
-        _ = db["itinerary"].find_one({"_id": ObjectId(payload.itinerary_id)})
-        if _ is None:
-            raise HTTPException(status_code=404, detail="Itinerary not found")
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid itinerary_id")
+    await require_itinerary(payload.itinerary_id)
 
     data = payload.model_dump()
-    inserted_id = create_document("reservation", data)
+    inserted_id = await create_document("reservation", with_search_tokens(data))
+    await bump(itinerary_key(payload.itinerary_id))
     return {"id": inserted_id, **data}
 
 
+def build_reservation_filter(
+    itinerary_id: str,
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    provider: Optional[str] = None,
+    location: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Dict:
+    """Translate the reservation list filters into a single Mongo query.
+
+    Reservations without a start/end time are kept by the time window, as
+    before; `None` matches both missing and null fields.
+    """
+    filters: Dict = {"itinerary_id": itinerary_id}
+    if category:
+        filters["category"] = category
+    if provider:
+        filters["provider"] = provider
+    if location:
+        filters["location"] = location
+
+    clauses = []
+    if start:
+        clauses.append({"$or": [{"start_time": {"$gte": start}}, {"start_time": None}]})
+    if end:
+        clauses.append({"$or": [{"end_time": {"$lte": end}}, {"end_time": None}]})
+    if q:
+        search = build_search_clauses(q)
+        if not search:
+            pattern = {"$regex": re.escape(q), "$options": "i"}
+            search = [{"$or": [{"title": pattern}, {"location": pattern}, {"provider": pattern}]}]
+        clauses.extend(search)
+    if clauses:
+        filters["$and"] = clauses
+
+    return filters
+
+
 @app.get("/api/itineraries/{itinerary_id}/reservations")
-def list_reservations(
+async def list_reservations(
     itinerary_id: str,
-    q: Optional[str] = Query(None, description="Search text in title/location/provider"),
+    request: Request,
+    q: Optional[str] = Query(None, description="Search title/location/provider by word prefix"),
     category: Optional[str] = Query(None),
     provider: Optional[str] = Query(None),
     location: Optional[str] = Query(None),
     start: Optional[datetime] = Query(None, description="Start time filter"),
     end: Optional[datetime] = Query(None, description="End time filter"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    format: Literal["json", "ndjson"] = Query("json"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    view: Literal["full", "compact"] = Query("full", description="compact: timeline fields only"),
 ):
     from bson import ObjectId
     try:
         _ = ObjectId(itinerary_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid itinerary_id")
+    names = requested_fields(fields, view, RESERVATION_FIELDS, COMPACT_RESERVATION_FIELDS)
+
+    etag, not_modified = await check_version(request, itinerary_key(itinerary_id))
+    if not_modified:
+        return not_modified
+
+    filters = build_reservation_filter(
+        itinerary_id,
+        q=q,
+        category=category,
+        provider=provider,
+        location=location,
+        start=start,
+        end=end,
+    )
+
+    sort = sort_spec("start_time")
+    if q:
+        # Relevance order has no stable key to resume from, so search results
+        # are ranked in memory and capped by `limit` instead of paged. Only a
+        # bounded candidate set is read, however broad the query; one extra
+        # match tells whether the set was cut short, flagged by X-Truncated.
+        if after:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not supported with q")
+        projection, transform = build_projection(names, ("search_tokens",))
+        candidates = candidate_limit(limit)
+        matches = await iter_documents(
+            "reservation", filters, sort=sort, limit=candidates + 1, projection=projection
+        ).to_list(length=candidates + 1)
+        truncated = len(matches) > candidates
+        ranked = rank(matches[:candidates], q)[:limit]
+        response = await list_response(ranked, None, format, etag=etag, transform=transform)
+        if truncated:
+            response.headers["X-Truncated"] = "true"
+        return response
+
+    if after:
+        filters = {"$and": [filters, cursor_filter(after, "start_time")]}
+    # start_time is needed to encode the next-page cursor
+    projection, transform = build_projection(names, ("start_time",))
+    docs = iter_documents("reservation", filters, sort=sort, limit=page_fetch_limit(limit, format), projection=projection)
+    return await list_response(docs, limit, format, "start_time", etag=etag, transform=transform)
+
+
+@app.get("/api/itineraries/{itinerary_id}/timeline")
+async def get_timeline(
+    itinerary_id: str,
+    request: Request,
+    tz: str = Query("UTC", description="IANA time zone used for day boundaries"),
+):
+    """Reservations bucketed by local day across the trip, with category counts"""
+    from bson import ObjectId
 
-    filters = {"itinerary_id": itinerary_id}
-    if category:
-        filters["category"] = category
-    if provider:
-        filters["provider"] = provider
-    if location:
-        filters["location"] = location
+    await require_itinerary(itinerary_id)
+    etag, not_modified = await check_version(request, itinerary_key(itinerary_id))
+    if not_modified:
+        return not_modified
 
-    cursor = db["reservation"].find(filters)
-
-    results = []
-    for doc in cursor:
-        if start or end:
-            st = doc.get("start_time")
-            et = doc.get("end_time")
-            ok = True
-            if start and st and st < start:
-                ok = False
-            if end and et and et > end:
-                ok = False
-            if not ok:
-                continue
-        if q:
-            text = " ".join(
-                [
-                    str(doc.get("title", "")),
-                    str(doc.get("location", "")),
-                    str(doc.get("provider", "")),
-                ]
-            ).lower()
-            if q.lower() not in text:
-                continue
-
-        doc["id"] = str(doc.pop("_id", ""))
-        results.append(doc)
-
-    return results
+    timeline = timeline_cache.get((itinerary_id, etag))
+    if timeline is MISSING:
+        itinerary = await get_db()["itinerary"].find_one(
+            {"_id": ObjectId(itinerary_id)}, {"start_date": 1, "end_date": 1}
+        )
+        try:
+            timeline = await build_timeline(get_db(), itinerary, tz)
+        except InvalidTimezone as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        timeline_cache.set((itinerary_id, etag), timeline)
+    return FastJSONResponse(timeline, headers={"ETag": etag})
 
 
-# ------------------- Provider integrations -------------------
-SUPPORTED_PROVIDERS: Dict[str, str] = {
-    "booking.com": "providers.booking",
-    "agoda": "providers.agoda",
-    "viator": "providers.viator",
-    "klook": "providers.klook",
-    "getyourguide": "providers.getyourguide",
-}
+@app.get("/api/itineraries/{itinerary_id}/conflicts")
+async def get_conflicts(
+    itinerary_id: str,
+    request: Request,
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum conflicts listed; count is always exact"),
+):
+    """Overlapping lodgings and clashing non-lodging reservations"""
+    await require_itinerary(itinerary_id)
+    etag, not_modified = await check_version(request, itinerary_key(itinerary_id))
+    if not_modified:
+        return not_modified
+
+    # Streamed in index order (itinerary_id, start_time, _id) into the sweep
+    cursor = iter_documents(
+        "reservation",
+        # Strings sort before dates in BSON; only real datetimes can be swept
+        {"itinerary_id": itinerary_id, "start_time": {"$type": "date"}},
+        sort=sort_spec("start_time"),
+        projection=CONFLICT_FIELDS,
+    )
+    result = await find_conflicts_async(cursor, limit)
+    return FastJSONResponse({"itinerary_id": itinerary_id, **result}, headers={"ETag": etag})
 
 
+# ------------------- Provider integrations -------------------
 @app.get("/api/providers")
-def get_supported_providers():
+async def get_supported_providers():
     return {"providers": list(SUPPORTED_PROVIDERS.keys())}
 
 
+class AccountIn(BaseModel):
+    provider: str
+    label: Optional[str] = None
+    credentials_ref: Optional[str] = None
+
+
+@app.post("/api/accounts")
+async def create_account(payload: AccountIn):
+    """Register a connected provider account; its sync state starts empty"""
+    data = payload.model_dump()
+    data["provider"] = data["provider"].lower()
+    if data["provider"] not in SUPPORTED_PROVIDERS:
+        raise HTTPException(status_code=400, detail="Unsupported provider")
+    data.update({"status": "pending", "last_sync_at": None, "sync_cursor": None})
+    inserted_id = await create_document("account", data)
+    return {"id": inserted_id, **data}
+
+
+@app.get("/api/accounts/{account_id}")
+async def get_account(account_id: str):
+    from bson import ObjectId
+    try:
+        oid = ObjectId(account_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid account id")
+    doc = await get_db()["account"].find_one({"_id": oid})
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return FastJSONResponse(to_out(doc))
+
+
 class EmailMessageIn(BaseModel):
     subject: Optional[str] = ""
     sender: Optional[str] = ""
@@ -196,114 +602,219 @@ class EmailImportIn(BaseModel):
     messages: Optional[List[EmailMessageIn]] = None  # raw messages for demo
 
 
-@app.post("/api/import/email")
-def import_from_email(payload: EmailImportIn):
-    # Validate itinerary
-    from bson import ObjectId
-    try:
-        _ = db["itinerary"].find_one({"_id": ObjectId(payload.itinerary_id)})
-        if _ is None:
-            raise HTTPException(status_code=404, detail="Itinerary not found")
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid itinerary_id")
-
+async def run_email_import(payload: Dict, on_batch=None, keep_items: bool = True) -> Dict:
     # Import via Gmail helper (mockable). If messages provided, use them.
-    from providers.email_import import import_gmail_to_reservations
-
     raw_messages = None
-    if payload.messages:
+    if payload.get("messages"):
         # Map incoming fields to expected keys
         raw_messages = [
             {
-                "subject": m.subject or "",
-                "from": m.sender or "",
-                "body_text": m.body_text or "",
+                "subject": m.get("subject") or "",
+                "from": m.get("sender") or "",
+                "body_text": m.get("body_text") or "",
             }
-            for m in payload.messages
+            for m in payload["messages"]
         ]
 
-    account = {"access_token": payload.gmail_access_token}
+    account = {"access_token": payload.get("gmail_access_token")}
+    return await import_from_email_source(
+        payload["itinerary_id"],
+        account,
+        provider_hint=payload.get("provider_hint"),
+        raw_messages=raw_messages,
+        on_batch=on_batch,
+        keep_items=keep_items,
+    )
+
+
+@app.post("/api/import/email")
+async def import_from_email(
+    payload: EmailImportIn,
+    background: bool = Query(False, description="Run as a background job and return its id"),
+):
+    # Validate itinerary
+    await require_itinerary(payload.itinerary_id)
+
+    if background:
+        job_id = await submit_job("email", payload.model_dump())
+        return JSONResponse(status_code=202, content={"status": "queued", "job_id": job_id})
+
     try:
-        fetched: List[Dict] = import_gmail_to_reservations(
-            account,
-            provider_hint=payload.provider_hint,
-            raw_messages=raw_messages,
-        )
-    except Exception as e:
+        result = await run_email_import(payload.model_dump())
+    except ImportSourceError as e:
         raise HTTPException(status_code=400, detail=f"Email import failed: {str(e)[:120]}")
 
-    created = 0
-    items = []
-    for item in fetched:
-        data = {
-            **item,
-            "itinerary_id": payload.itinerary_id,
-        }
-        try:
-            inserted_id = create_document("reservation", data)
-            data["id"] = inserted_id
-            items.append(data)
-            created += 1
-        except Exception:
-            continue
-
-    return {"status": "ok", "source": "email", "created": created, "items": items}
+    return FastJSONResponse({"status": "ok", "source": "email", **result})
 
 
 class ProviderImportIn(BaseModel):
     itinerary_id: str
     provider: str
     access_token: Optional[str] = None
+    # Connected account whose sync cursor makes this a delta sync
+    account_id: Optional[str] = None
+    full_resync: bool = False
+
+
+async def run_provider_import(payload: Dict, on_batch=None, keep_items: bool = True) -> Dict:
+    account = {"access_token": payload.get("access_token")}
+    return await sync_account(
+        payload["itinerary_id"],
+        payload["provider"].lower(),
+        account,
+        account_id=payload.get("account_id"),
+        full_resync=payload.get("full_resync", False),
+        on_batch=on_batch,
+        keep_items=keep_items,
+    )
 
 
 @app.post("/api/import/provider")
-def import_from_provider(payload: ProviderImportIn):
+async def import_from_provider(
+    payload: ProviderImportIn,
+    background: bool = Query(False, description="Run as a background job and return its id"),
+):
     # Validate itinerary
-    from bson import ObjectId
-    try:
-        _ = db["itinerary"].find_one({"_id": ObjectId(payload.itinerary_id)})
-        if _ is None:
-            raise HTTPException(status_code=404, detail="Itinerary not found")
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid itinerary_id")
+    await require_itinerary(payload.itinerary_id)
 
     provider_key = payload.provider.lower()
     if provider_key not in SUPPORTED_PROVIDERS:
         raise HTTPException(status_code=400, detail="Unsupported provider")
 
-    # Dynamically import connector
-    module_path = SUPPORTED_PROVIDERS[provider_key]
-    try:
-        import importlib
-        connector = importlib.import_module(module_path)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Connector load error: {str(e)[:120]}")
+    if background:
+        if payload.account_id:
+            try:
+                await load_account(payload.account_id, provider_key)
+            except AccountNotFound as e:
+                raise HTTPException(status_code=404, detail=str(e))
+        job_id = await submit_job("provider", payload.model_dump())
+        return JSONResponse(status_code=202, content={"status": "queued", "job_id": job_id})
 
     # Fetch reservations from provider (mock connectors return sample data)
+    # and insert them into the itinerary
     try:
-        account = {"access_token": payload.access_token}
-        fetched: List[Dict] = connector.fetch_reservations(account)
-    except Exception as e:
+        result = await run_provider_import(payload.model_dump())
+    except AccountNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ConnectorLoadError as e:
+        raise HTTPException(status_code=500, detail=f"Connector load error: {str(e)[:120]}")
+    except ImportSourceError as e:
         raise HTTPException(status_code=400, detail=f"Provider fetch failed: {str(e)[:120]}")
 
-    # Insert into DB tied to itinerary
-    created = 0
-    items = []
-    for item in fetched:
-        data = {
-            **item,
-            "itinerary_id": payload.itinerary_id,
-        }
-        try:
-            inserted_id = create_document("reservation", data)
-            data["id"] = inserted_id
-            items.append(data)
-            created += 1
-        except Exception as e:
-            # Skip individual failures but continue
-            continue
-
-    return {"status": "ok", "provider": provider_key, "created": created, "items": items}
+    return FastJSONResponse({"status": "ok", "provider": provider_key, **result})
+
+
+class ProviderSyncIn(BaseModel):
+    itinerary_id: str
+    # Connectors to sync; defaults to every supported provider
+    providers: Optional[List[str]] = None
+    # Access token per provider key; connectors without one report not_configured
+    access_tokens: Dict[str, Optional[str]] = {}
+    timeout: Optional[float] = Field(None, gt=0, description="Per-connector fetch timeout in seconds")
+    # Connected account per provider key, for delta syncs
+    account_ids: Dict[str, str] = {}
+    full_resync: bool = False
+
+
+@app.post("/api/import/sync")
+async def sync_all_providers(payload: ProviderSyncIn):
+    """Import from every requested provider at once, reporting each separately"""
+    await require_itinerary(payload.itinerary_id)
+
+    provider_keys = [p.lower() for p in (payload.providers or SUPPORTED_PROVIDERS)]
+    unsupported = [p for p in provider_keys if p not in SUPPORTED_PROVIDERS]
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"Unsupported provider: {', '.join(unsupported)}")
+
+    tokens = {k.lower(): v for k, v in payload.access_tokens.items()}
+    accounts = {p: {"access_token": tokens.get(p)} for p in dict.fromkeys(provider_keys)}
+    timeout = min(payload.timeout or SYNC_TIMEOUT_SECONDS, SYNC_TIMEOUT_SECONDS)
+    account_ids = {k.lower(): v for k, v in payload.account_ids.items()}
+    results = await sync_providers(
+        payload.itinerary_id,
+        accounts,
+        timeout=timeout,
+        concurrency=SYNC_CONCURRENCY,
+        account_ids=account_ids,
+        full_resync=payload.full_resync,
+    )
+
+    attempted = [r for r in results.values() if r["status"] != "not_configured"]
+    succeeded = sum(1 for r in attempted if r["status"] == "ok")
+    if succeeded == len(attempted):
+        status = "ok"
+    elif succeeded:
+        status = "partial"
+    else:
+        status = "error"
+    return FastJSONResponse({"status": status, "providers": results})
+
+
+# ------------------- Background jobs -------------------
+async def submit_job(kind: str, payload: Dict) -> str:
+    try:
+        return await jobs.submit(kind, payload)
+    except jobs.PayloadTooLarge as e:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{e}. Split the import into smaller requests.",
+        )
+
+
+async def run_email_job(payload: Dict, on_batch) -> Dict:
+    return await run_email_import(payload, on_batch=on_batch, keep_items=False)
+
+
+async def run_provider_job(payload: Dict, on_batch) -> Dict:
+    return await run_provider_import(payload, on_batch=on_batch, keep_items=False)
+
+
+jobs.register("email", run_email_job, secret_fields=("gmail_access_token",))
+jobs.register("provider", run_provider_job, secret_fields=("access_token",))
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    job = await jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return FastJSONResponse(job)
+
+
+# ------------------- Admin -------------------
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # Without ADMIN_TOKEN the admin endpoints don't exist
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # compare_digest rejects non-ASCII str, so compare the raw header bytes
+    # (Starlette decodes headers as latin-1)
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode("latin-1"), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@app.get("/api/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_request_profiles():
+    return {"profiles": await run_in_threadpool(profiling.list_profiles)}
+
+
+@app.get("/api/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_request_profile(
+    profile_id: str,
+    format: Literal["json", "pstats"] = Query("json", description="pstats: raw dump for pstats/snakeviz"),
+    sort: Literal["cumulative", "tottime", "calls"] = Query("cumulative"),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    summary = await run_in_threadpool(profiling.load_summary, profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "pstats":
+        path = profiling.profile_path(profile_id)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+    stats = await run_in_threadpool(profiling.render_stats, profile_id, sort, limit)
+    return {**summary, "stats": stats}
 
 
 if __name__ == "__main__":
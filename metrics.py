@@ -0,0 +1,242 @@
+"""
+Metrics
+
+Dependency-free Prometheus metrics: counters and fixed-bucket histograms kept
+in process memory, rendered in the text exposition format by /metrics.
+
+- MetricsMiddleware: per-route latency histogram and status counts (routes
+  are labelled by their path template, so ids don't blow up cardinality)
+- CommandMetrics: a pymongo CommandListener timing every database command
+  by collection and operation
+- import counters updated by the import pipeline
+
+Recording is a dict lookup, a bisect and an addition under an uncontended
+lock, so it is cheap enough to leave on for every request. Values are per
+process; with several workers each exposes its own.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labelvalues) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._le = ['le="%g"' % b for b in self.buckets] + ['le="+Inf"']
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labelvalues) -> int:
+        series = self._series.get(labelvalues)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1])) for k, v in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for le, n in zip(self._le, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP responses by route and status", ("method", "route", "status"))
+DB_COMMAND_SECONDS = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency", ("collection", "command"), DB_BUCKETS)
+DB_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands", ("collection", "command"))
+IMPORT_EMAILS_PARSED = Counter(
+    "import_emails_parsed_total", "Email messages run through the reservation parser")
+IMPORT_ITEMS = Counter(
+    "import_items_total", "Imported reservations by outcome", ("source", "result"))
+
+REGISTRY = [
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    DB_COMMAND_SECONDS,
+    DB_COMMAND_FAILURES,
+    IMPORT_EMAILS_PARSED,
+    IMPORT_ITEMS,
+]
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def route_label(scope: Dict) -> str:
+    # FastAPI puts the matched route in the scope; its template keeps ids out
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and status per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_label(scope)
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method, route)
+            HTTP_REQUESTS.inc(1, method, route, str(status))
+
+
+class CommandTrace:
+    """The `limit` slowest commands issued while this trace is current"""
+
+    def __init__(self, limit: int = 20):
+        self.limit = limit
+        self.count = 0
+        self._heap: List[Tuple] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, collection: str, command: str, ok: bool) -> None:
+        entry = (seconds, next(self._seq), collection, command, ok)
+        with self._lock:
+            self.count += 1
+            if len(self._heap) < self.limit:
+                heapq.heappush(self._heap, entry)
+            else:
+                heapq.heappushpop(self._heap, entry)
+
+    def slowest(self) -> List[Dict]:
+        with self._lock:
+            entries = sorted(self._heap, reverse=True)
+        return [
+            {"ms": round(seconds * 1000, 3), "collection": collection, "command": command, "ok": ok}
+            for seconds, _, collection, command, ok in entries
+        ]
+
+
+# Set by the profiling middleware for the request being profiled. Motor runs
+# driver calls with a copy of the caller's context, so the listener sees it.
+command_trace: ContextVar[Optional[CommandTrace]] = ContextVar("command_trace", default=None)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Times MongoDB commands by collection and command name.
+
+    Succeeded/failed events don't carry the command document, so the
+    collection is remembered from the started event until the reply arrives.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event) -> None:
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ""
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = collection
+
+    def _collection(self, event) -> str:
+        with self._lock:
+            return self._pending.pop((event.connection_id, event.request_id), "")
+
+    def succeeded(self, event) -> None:
+        self._observe(event, ok=True)
+
+    def failed(self, event) -> None:
+        self._observe(event, ok=False)
+
+    def _observe(self, event, ok: bool) -> None:
+        seconds = event.duration_micros / 1e6
+        collection = self._collection(event)
+        DB_COMMAND_SECONDS.observe(seconds, collection, event.command_name)
+        if not ok:
+            DB_COMMAND_FAILURES.inc(1, collection, event.command_name)
+        trace = command_trace.get()
+        if trace is not None:
+            trace.record(seconds, collection, event.command_name, ok)
+
+
+command_metrics = CommandMetrics()
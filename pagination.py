@@ -0,0 +1,82 @@
+"""
+Keyset Pagination and NDJSON Streaming
+
+List endpoints page with an opaque `after` token that encodes the sort key of
+the last document returned, so each page is an index range scan rather than a
+growing skip. NDJSON mode writes documents straight from the cursor.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from bson import ObjectId
+
+from responses import dumps
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(doc: Dict, sort_field: Optional[str] = None) -> str:
+    """Token pointing just past `doc` in (sort_field, _id) order"""
+    payload = {"id": str(doc["_id"])}
+    if sort_field:
+        value = doc.get(sort_field)
+        payload["v"] = value.isoformat() if isinstance(value, datetime) else None
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Optional[datetime], ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        value = payload.get("v")
+        return (datetime.fromisoformat(value) if value else None), ObjectId(payload["id"])
+    except Exception:
+        raise InvalidCursor("Invalid pagination cursor")
+
+
+def keyset_filter(token: str, sort_field: Optional[str] = None) -> Dict:
+    """Mongo clause selecting documents after the cursor.
+
+    Ascending sorts put missing/null values first, so a cursor sitting on a
+    null sort value continues through the remaining nulls and then every
+    non-null value.
+    """
+    value, oid = decode_cursor(token)
+    if not sort_field:
+        return {"_id": {"$gt": oid}}
+    if value is None:
+        return {"$or": [{sort_field: None, "_id": {"$gt": oid}}, {sort_field: {"$ne": None}}]}
+    return {"$or": [{sort_field: {"$gt": value}}, {sort_field: value, "_id": {"$gt": oid}}]}
+
+
+def sort_spec(sort_field: Optional[str] = None) -> List[Tuple[str, int]]:
+    return ([(sort_field, 1)] if sort_field else []) + [("_id", 1)]
+
+
+async def take_page(cursor: AsyncIterable[Dict], limit: int, sort_field: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """Read up to `limit` documents (cursor should be limited to limit + 1).
+
+    Returns the page and the token for the next one, or None on the last page.
+    """
+    docs = []
+    async for doc in cursor:
+        if len(docs) == limit:
+            return docs, encode_cursor(docs[-1], sort_field)
+        docs.append(doc)
+    return docs, None
+
+
+async def ndjson_lines(docs: Union[AsyncIterable[Dict], Iterable[Dict]], transform: Callable[[Dict], Dict]) -> AsyncIterator[bytes]:
+    """Serialize documents one per line as they are read from the cursor"""
+    if isinstance(docs, AsyncIterable):
+        async for doc in docs:
+            yield dumps(transform(doc)) + b"\n"
+    else:
+        for doc in docs:
+            yield dumps(transform(doc)) + b"\n"
@@ -0,0 +1,182 @@
+"""
+On-Demand Request Profiling
+
+Opt-in cProfile capture for individual requests in production. A request is
+profiled when it carries `X-Profile: <PROFILE_TOKEN>` or is picked by the
+PROFILE_SAMPLE_RATE sample. Each capture is stored in PROFILE_DIR as a pstats
+dump plus a JSON summary (route, status, elapsed time and the slowest MongoDB
+commands the request issued), and the directory is kept as a ring of the
+newest PROFILE_MAX_FILES captures. Profiled responses carry an X-Profile-Id
+header naming their capture.
+
+The middleware is only installed when a token or sample rate is configured,
+so nothing here runs otherwise.
+
+cProfile hooks the event loop thread: a capture includes whatever else the
+loop ran meanwhile and not work done in worker threads (connector fetches,
+email parsing). Only one request is profiled at a time; others arriving
+during a capture run unprofiled.
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import secrets
+import time
+from typing import Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from metrics import CommandTrace, command_trace, route_label
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_SLOW_COMMANDS = int(os.getenv("PROFILE_SLOW_COMMANDS", "20"))
+PROFILE_HEADER = b"x-profile"
+
+logger = logging.getLogger(__name__)
+
+_PROFILE_ID = re.compile(r"^\d+-[0-9a-f]{8}$")
+_busy = False
+
+
+def enabled() -> bool:
+    return bool(PROFILE_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+
+def _requested(scope) -> bool:
+    if PROFILE_TOKEN:
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER and hmac.compare_digest(value, PROFILE_TOKEN.encode()):
+                return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def _paths(profile_id: str):
+    base = os.path.join(PROFILE_DIR, profile_id)
+    return base + ".prof", base + ".json"
+
+
+def store_profile(profile_id: str, profiler: cProfile.Profile, summary: Dict) -> None:
+    """Write one capture and drop the oldest beyond PROFILE_MAX_FILES"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    prof_path, json_path = _paths(profile_id)
+    profiler.dump_stats(prof_path)
+    # The summary is written last: list_profiles only sees complete captures
+    with open(json_path, "w") as f:
+        json.dump(summary, f)
+    stale = list_profile_ids()[:-PROFILE_MAX_FILES] if PROFILE_MAX_FILES > 0 else []
+    for old in stale:
+        for path in _paths(old):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def list_profile_ids() -> List[str]:
+    """Stored capture ids, oldest first (ids start with a nanosecond timestamp)"""
+    try:
+        names = os.listdir(PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    ids = [n[:-5] for n in names if n.endswith(".json") and _PROFILE_ID.match(n[:-5])]
+    return sorted(ids, key=lambda i: int(i.split("-")[0]))
+
+
+def list_profiles() -> List[Dict]:
+    """Summaries of stored captures, newest first"""
+    out = []
+    for profile_id in reversed(list_profile_ids()):
+        summary = load_summary(profile_id)
+        if summary is not None:
+            out.append(summary)
+    return out
+
+
+def load_summary(profile_id: str) -> Optional[Dict]:
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    try:
+        with open(_paths(profile_id)[1]) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    """Path of a capture's pstats dump, or None if unknown"""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = _paths(profile_id)[0]
+    return path if os.path.exists(path) else None
+
+
+def render_stats(profile_id: str, sort: str = "cumulative", limit: int = 50) -> Optional[str]:
+    """pstats text report of a capture"""
+    path = profile_path(profile_id)
+    if path is None:
+        return None
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requested or sampled requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _busy
+        if scope["type"] != "http" or _busy or not _requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        _busy = True
+        profile_id = f"{time.time_ns()}-{secrets.token_hex(4)}"
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        trace = CommandTrace(PROFILE_SLOW_COMMANDS)
+        token = command_trace.set(trace)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            command_trace.reset(token)
+            _busy = False
+            summary = {
+                "id": profile_id,
+                "created_at": time.time(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_label(scope),
+                "status": status,
+                "elapsed_ms": round(elapsed * 1000, 3),
+                "db_commands": trace.count,
+                "slowest_db_commands": trace.slowest(),
+            }
+            try:
+                await run_in_threadpool(store_profile, profile_id, profiler, summary)
+            except Exception:
+                logger.exception("Storing profile %s failed", profile_id)
@@ -1,12 +1,18 @@
-from typing import List, Dict
-from .base import normalize, ProviderNotConfigured
+from datetime import datetime
+from typing import List, Dict, Optional
+import os
+from .base import normalize, fetch_normalized, filter_since, ProviderNotConfigured
 
+API_URL = os.getenv("AGODA_API_URL", "")
 
-def fetch_reservations(account: Dict) -> List[Dict]:
+
+def fetch_reservations(account: Dict, since: Optional[datetime] = None) -> List[Dict]:
     token = account.get("access_token")
     if not token:
         raise ProviderNotConfigured("Agoda access token missing")
-    return [
+    if API_URL:
+        return fetch_normalized(API_URL, "agoda", token, category="lodging", since=since)
+    return filter_since([
         normalize({
             "provider": "agoda",
             "category": "lodging",
@@ -14,5 +20,6 @@ def fetch_reservations(account: Dict) -> List[Dict]:
             "location": "Phuket",
             "confirmation_number": "AG-778899",
             "details": {"nights": 3, "guests": 2},
+            "provider_updated_at": "2025-01-06T12:30:00Z",
         })
-    ]
+    ], since)
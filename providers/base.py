@@ -1,12 +1,33 @@
-from typing import List, Dict
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
 
 # Common interface for provider connectors
-# Each connector should implement fetch_reservations(account: dict) -> List[Dict]
+# Each connector should implement
+#   fetch_reservations(account: dict, since: Optional[datetime] = None) -> List[Dict]
+# returning only bookings changed after `since` when it is given (a full
+# history otherwise). Items carry provider_updated_at so the importer can
+# advance the account's sync cursor.
 
 class ProviderNotConfigured(Exception):
     pass
 
 
+class ProviderAPIError(Exception):
+    """A provider API call failed after retries, or returned a non-retryable error"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
 def normalize(item: Dict) -> Dict:
     # Ensure basic fields exist
     return {
@@ -14,9 +35,199 @@ def normalize(item: Dict) -> Dict:
         "category": item.get("category", "other"),
         "title": item.get("title", "Reservation"),
         "location": item.get("location"),
-        "start_time": item.get("start_time"),
-        "end_time": item.get("end_time"),
+        # API JSON carries ISO strings; stored times must be dates to match the
+        # window filters, the timeline and the start_time ordering
+        "start_time": as_datetime(item.get("start_time")),
+        "end_time": as_datetime(item.get("end_time")),
         "confirmation_number": item.get("confirmation_number"),
         "details": item.get("details", {}),
         "source": "api",
+        "provider_updated_at": as_datetime(item.get("provider_updated_at")),
     }
+
+
+def as_datetime(value: Any) -> Optional[datetime]:
+    """Aware UTC datetime from a datetime or ISO string; None if unparseable"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def filter_since(items: List[Dict], since: Optional[datetime]) -> List[Dict]:
+    """Items changed after `since`; items without provider_updated_at are kept"""
+    if since is None:
+        return items
+    since = as_datetime(since)
+    out = []
+    for item in items:
+        updated = as_datetime(item.get("provider_updated_at"))
+        if updated is None or updated > since:
+            out.append(item)
+    return out
+
+
+# ------------------- Shared HTTP layer -------------------
+# Connectors run in worker threads, several at once. One keep-alive session per
+# host is shared by all of them, and a per-host semaphore caps the requests in
+# flight so a sync fan-out cannot flood a single provider.
+HTTP_POOL_SIZE = int(os.getenv("PROVIDER_HTTP_POOL_SIZE", "10"))
+HTTP_MAX_CONCURRENCY = int(os.getenv("PROVIDER_HTTP_MAX_CONCURRENCY", "4"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("PROVIDER_HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("PROVIDER_HTTP_BACKOFF_BASE", "0.5"))
+HTTP_BACKOFF_MAX = float(os.getenv("PROVIDER_HTTP_BACKOFF_MAX", "10"))
+HTTP_MAX_PAGES = int(os.getenv("PROVIDER_HTTP_MAX_PAGES", "100"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_sessions: Dict[str, requests.Session] = {}
+_host_limits: Dict[str, threading.BoundedSemaphore] = {}
+_sessions_lock = threading.Lock()
+
+
+def _host(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_session(url: str) -> requests.Session:
+    """Keep-alive session for the host of `url`, created on first use"""
+    host = _host(url)
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            # Retries are handled in request_json, not by urllib3
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+            session.mount(host, adapter)
+            _sessions[host] = session
+            _host_limits[host] = threading.BoundedSemaphore(HTTP_MAX_CONCURRENCY)
+        return session
+
+
+def close_sessions() -> None:
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _host_limits.clear()
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Seconds to wait before retry number `attempt` (0-based).
+
+    Honors a numeric Retry-After header, else uses full jitter: a uniform
+    draw up to an exponentially growing, capped ceiling, so clients that
+    failed together do not retry together.
+    """
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), HTTP_BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+
+def request_json(
+    method: str,
+    url: str,
+    token: Optional[str] = None,
+    params: Optional[Dict] = None,
+    json: Any = None,
+    timeout: float = HTTP_TIMEOUT_SECONDS,
+    max_retries: int = HTTP_MAX_RETRIES,
+) -> Any:
+    """Call a provider API and return the decoded JSON body.
+
+    Connection errors, timeouts, 429 and 5xx responses are retried up to
+    `max_retries` times with jittered backoff; other errors raise
+    ProviderAPIError straight away.
+    """
+    session = get_session(url)
+    limit = _host_limits[_host(url)]
+    headers = {"Accept": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+
+    for attempt in range(max_retries + 1):
+        retry_after = None
+        try:
+            with limit:
+                resp = session.request(method, url, params=params, json=json, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = ProviderAPIError(f"{method} {url} failed: {e}")
+        else:
+            if resp.status_code < 400:
+                try:
+                    return resp.json()
+                except ValueError:
+                    raise ProviderAPIError(f"{method} {url} returned invalid JSON", resp.status_code)
+            error = ProviderAPIError(f"{method} {url} returned HTTP {resp.status_code}", resp.status_code)
+            if resp.status_code not in RETRY_STATUSES:
+                raise error
+            retry_after = resp.headers.get("Retry-After")
+        if attempt < max_retries:
+            time.sleep(backoff_delay(attempt, retry_after))
+    raise error
+
+
+def iter_pages(
+    url: str,
+    token: Optional[str] = None,
+    params: Optional[Dict] = None,
+    items_key: str = "items",
+    cursor_key: str = "next_cursor",
+    cursor_param: str = "cursor",
+    max_pages: int = HTTP_MAX_PAGES,
+) -> Iterator[List[Dict]]:
+    """Yield each page of a cursor-paginated list endpoint.
+
+    Expects `{items_key: [...], cursor_key: <token or null>}` bodies and sends
+    the token back as the `cursor_param` query parameter.
+    """
+    params = dict(params or {})
+    for _ in range(max_pages):
+        body = request_json("GET", url, token=token, params=params)
+        yield body.get(items_key) or []
+        cursor = body.get(cursor_key)
+        if not cursor:
+            return
+        params[cursor_param] = cursor
+    raise ProviderAPIError(f"GET {url} exceeded {max_pages} pages")
+
+
+def fetch_all(url: str, token: Optional[str] = None, **kwargs) -> List[Dict]:
+    """All items of a paginated endpoint as one list"""
+    out: List[Dict] = []
+    for page in iter_pages(url, token=token, **kwargs):
+        out.extend(page)
+    return out
+
+
+def fetch_normalized(
+    api_url: str,
+    provider: str,
+    token: str,
+    category: Optional[str] = None,
+    since: Optional[datetime] = None,
+) -> List[Dict]:
+    """Fetch `{api_url}/reservations` and normalize each item for `provider`.
+
+    With `since`, only bookings updated after it are requested (and any the
+    API returns anyway are dropped).
+    """
+    params = {"updated_since": as_datetime(since).isoformat()} if since else None
+    out = []
+    for item in fetch_all(f"{api_url.rstrip('/')}/reservations", token=token, params=params):
+        item = {**item, "provider": provider}
+        if category and "category" not in item:
+            item["category"] = category
+        out.append(normalize(item))
+    return filter_since(out, since)
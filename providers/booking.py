@@ -1,12 +1,12 @@
-from typing import List, Dict
-import requests
+from datetime import datetime
+from typing import List, Dict, Optional
 import os
-from .base import normalize, ProviderNotConfigured
+from .base import normalize, fetch_normalized, filter_since, ProviderNotConfigured
 
 API_URL = os.getenv("BOOKING_API_URL", "")
 
 
-def fetch_reservations(account: Dict) -> List[Dict]:
+def fetch_reservations(account: Dict, since: Optional[datetime] = None) -> List[Dict]:
     """
     Demo Booking.com connector (mock).
     In real usage, implement OAuth/token exchange and call provider APIs.
@@ -15,8 +15,11 @@ def fetch_reservations(account: Dict) -> List[Dict]:
     if not token:
         raise ProviderNotConfigured("Booking access token missing")
 
-    # Placeholder: simulate results instead of real API call
-    return [
+    if API_URL:
+        return fetch_normalized(API_URL, "booking.com", token, category="lodging", since=since)
+
+    # Placeholder: simulate results when no API is configured
+    return filter_since([
         normalize({
             "provider": "booking.com",
             "category": "lodging",
@@ -26,5 +29,6 @@ def fetch_reservations(account: Dict) -> List[Dict]:
             "end_time": None,
             "confirmation_number": "BK-123456",
             "details": {"nights": 2, "guests": 2},
+            "provider_updated_at": "2025-01-05T09:00:00Z",
         })
-    ]
+    ], since)
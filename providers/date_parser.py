@@ -0,0 +1,138 @@
+import re
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .email_parsers import DATE_RE, TIME_RE
+
+# Turns the date/time hints produced by parse_email into datetimes.
+#
+# A hint is "<date> <time>" where either part may be missing or the literal
+# "None" (e.g. "12 March 2025 3:00 PM", "2025-03-12 None", "None 10:30").
+# Dates come in the three shapes DATE_RE matches, times in the TIME_RE shape:
+#
+#   2025-03-12          12 March 2025 / 12 Mar 2025       March 12, 2025
+#   10:30               3:00 PM / 3:00pm
+#
+# Each shape has its own precompiled pattern and is picked by the first
+# character, so parsing a hint is one anchored match plus int() calls, with
+# no strptime format guessing. Month names are resolved through a memoized
+# lookup. Results are naive datetimes (the hint carries no zone), except for
+# full ISO strings with an offset, which keep it. Unparseable parts give None.
+
+MONTHS: Dict[str, int] = {}
+for _number, _name in enumerate(
+    ["january", "february", "march", "april", "may", "june", "july",
+     "august", "september", "october", "november", "december"], start=1
+):
+    MONTHS[_name] = _number
+    MONTHS[_name[:3]] = _number
+MONTHS["sept"] = 9
+
+_ISO_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+_DAY_MONTH_YEAR = re.compile(r"(\d{1,2})\s(\w{3,9})\s(\d{4})")
+_MONTH_DAY_YEAR = re.compile(r"(\w{3,9})\s(\d{1,2}),\s(\d{4})")
+_TIME = re.compile(r"(\d{1,2}):(\d{2})(?:\s?([AP])M)?", re.IGNORECASE)
+# A hint: optional date (or "None"), optional time (or "None")
+_HINT = re.compile(
+    rf"\s*(?:{DATE_RE}|None)?\s*(?:{TIME_RE}|None)?\s*", re.IGNORECASE
+)
+
+HINT_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=256)
+def month_number(name: str) -> Optional[int]:
+    """Month for a full or abbreviated English month name, any case"""
+    return MONTHS.get(name.lower().rstrip("."))
+
+
+def _make_date(year: str, month: Optional[int], day: str) -> Optional[date]:
+    if month is None:
+        return None
+    try:
+        return date(int(year), month, int(day))
+    except ValueError:
+        return None
+
+
+def parse_date(text: str) -> Optional[date]:
+    """Date from any DATE_RE shape, or None"""
+    if not text:
+        return None
+    if text[0].isdigit():
+        m = _ISO_DATE.fullmatch(text)
+        if m:
+            return _make_date(m.group(1), int(m.group(2)), m.group(3))
+        m = _DAY_MONTH_YEAR.fullmatch(text)
+        if m:
+            return _make_date(m.group(3), month_number(m.group(2)), m.group(1))
+        return None
+    m = _MONTH_DAY_YEAR.fullmatch(text)
+    if m:
+        return _make_date(m.group(3), month_number(m.group(1)), m.group(2))
+    return None
+
+
+def parse_time(text: str) -> Optional[time]:
+    """Time from a TIME_RE match (24-hour, or 12-hour with AM/PM), or None"""
+    m = _TIME.fullmatch(text) if text else None
+    if not m:
+        return None
+    hour, minute, meridiem = int(m.group(1)), int(m.group(2)), m.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.upper() == "P" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return time(hour, minute)
+
+
+@lru_cache(maxsize=HINT_CACHE_SIZE)
+def split_hint(hint: str) -> Tuple[Optional[date], Optional[time]]:
+    """(date, time) parts of a parse_email hint; either may be None"""
+    m = _HINT.fullmatch(hint)
+    if not m:
+        return _parse_iso(hint), None
+    date_text, time_text = m.group(1), m.group(2)
+    return (parse_date(date_text) if date_text else None,
+            parse_time(time_text) if time_text else None)
+
+
+def _parse_iso(text: str) -> Optional[datetime]:
+    # Full ISO timestamps ("2025-03-12T10:00:00Z") from non-email sources
+    if len(text) >= 10 and text[:10].count("-") == 2:
+        try:
+            return datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return None
+
+
+def parse_hint(hint: Optional[str], default_date: Optional[date] = None) -> Optional[datetime]:
+    """Datetime for a hint; a time-only hint uses `default_date` if given.
+
+    A date without a time is midnight of that day.
+    """
+    if not hint:
+        return None
+    day, at = split_hint(hint)
+    if isinstance(day, datetime):
+        return day
+    day = day or default_date
+    if day is None:
+        return None
+    return datetime.combine(day, at or time())
+
+
+def parse_hint_pair(start_hint: Optional[str], end_hint: Optional[str]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Start and end datetimes; an end with only a time falls on the start day"""
+    start = parse_hint(start_hint)
+    end = parse_hint(end_hint, default_date=start.date() if start else None)
+    return start, end
+
+
+def parse_hint_pairs(pairs: Iterable[Tuple[Optional[str], Optional[str]]]) -> List[Tuple[Optional[datetime], Optional[datetime]]]:
+    """parse_hint_pair over a batch; repeated hints are parsed once"""
+    return [parse_hint_pair(start, end) for start, end in pairs]
@@ -1,50 +1,70 @@
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, Iterator, List, Dict, Optional
 from datetime import datetime
 
-from .gmail import fetch_messages, messages_to_reservations
+from .gmail import iter_messages, iter_reservation_batches
 from .base import normalize
+from .date_parser import parse_hint_pair, parse_hint_pairs
 
 
-def import_gmail_to_reservations(account: dict, provider_hint: Optional[str] = None, raw_messages: Optional[List[Dict]] = None) -> List[Dict]:
-    messages = fetch_messages(account, raw_eml_list=raw_messages)
-    reservations = messages_to_reservations(messages, provider_hint=provider_hint)
+def normalize_email_reservation(r: Dict) -> Dict:
+    start, end = parse_hint_pair(r.get("start_time_hint"), r.get("end_time_hint"))
+    return _normalize(r, start, end)
 
-    normalized = []
-    for r in reservations:
-        item = {
-            **normalize({
-                "provider": r.get("provider", "email"),
-                "category": r.get("category", "other"),
-                "title": r.get("title", "Reservation"),
-                "location": r.get("location"),
-                "confirmation_number": r.get("confirmation_number"),
-                "details": r.get("details", {}),
-            }),
-            "source": "email",
-        }
-
-        # Attach hints to details for future refinement
-        st = r.get("start_time_hint")
-        et = r.get("end_time_hint")
-        if st or et:
-            item.setdefault("details", {})
-            item["details"].update({"start_time_hint": st, "end_time_hint": et})
-
-        # Try naive datetime parsing for ISO-like strings
-        for key in ("start_time_hint", "end_time_hint"):
-            val = item.get("details", {}).get(key)
-            if isinstance(val, str):
-                try:
-                    # Very permissive parse: try fromisoformat if close to ISO
-                    if len(val) >= 10 and val[:10].count("-") == 2:
-                        dt = datetime.fromisoformat(val.replace("Z", "+00:00"))
-                        if key == "start_time_hint":
-                            item["start_time"] = dt
-                        else:
-                            item["end_time"] = dt
-                except Exception:
-                    pass
-
-        normalized.append(item)
 
+def normalize_email_reservations(reservations: List[Dict]) -> List[Dict]:
+    """normalize_email_reservation over a parsed batch"""
+    times = parse_hint_pairs((r.get("start_time_hint"), r.get("end_time_hint")) for r in reservations)
+    return [_normalize(r, start, end) for r, (start, end) in zip(reservations, times)]
+
+
+def _normalize(r: Dict, start: Optional[datetime], end: Optional[datetime]) -> Dict:
+    item = {
+        **normalize({
+            "provider": r.get("provider", "email"),
+            "category": r.get("category", "other"),
+            "title": r.get("title", "Reservation"),
+            "location": r.get("location"),
+            "confirmation_number": r.get("confirmation_number"),
+            "details": r.get("details", {}),
+        }),
+        "source": "email",
+    }
+
+    # Keep the raw hints in details for future refinement
+    st = r.get("start_time_hint")
+    et = r.get("end_time_hint")
+    if st or et:
+        item.setdefault("details", {})
+        item["details"].update({"start_time_hint": st, "end_time_hint": et})
+
+    if start is not None:
+        item["start_time"] = start
+    if end is not None:
+        item["end_time"] = end
+    return item
+
+
+def iter_gmail_reservation_batches(
+    account: dict,
+    provider_hint: Optional[str] = None,
+    raw_messages: Optional[Iterable[Dict]] = None,
+    batch_size: int = 500,
+    on_parsed: Optional[Callable[[int], None]] = None,
+) -> Iterator[List[Dict]]:
+    """Fetch -> parse -> normalize as a pipeline of bounded batches.
+
+    Only one batch of messages and its reservations are alive at a time, so
+    memory stays flat however large the mailbox is.
+    """
+    messages = iter_messages(account, raw_eml_list=raw_messages)
+    for reservations in iter_reservation_batches(
+        messages, provider_hint=provider_hint, batch_size=batch_size, on_parsed=on_parsed
+    ):
+        yield normalize_email_reservations(reservations)
+
+
+def import_gmail_to_reservations(account: dict, provider_hint: Optional[str] = None, raw_messages: Optional[List[Dict]] = None) -> List[Dict]:
+    normalized = []
+    for batch in iter_gmail_reservation_batches(account, provider_hint=provider_hint, raw_messages=raw_messages):
+        normalized.extend(batch)
     return normalized
@@ -1,8 +1,15 @@
 import re
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence
 
 # Very lightweight, heuristic parsers for common provider confirmation emails.
 # We scan subject + body text and try to extract core fields.
+#
+# parse_email lowercases each part of a message once and shares the result
+# between provider detection, categorization and the extractors. Patterns are
+# compiled at import time, and the expensive ones only run where they can
+# possibly match: date/time patterns around digits, keyword-led patterns from
+# the first occurrence of their keyword. Output is identical to running each
+# pattern over the whole text.
 
 PROVIDER_HINTS = {
     "booking.com": ["booking.com", "Your booking", "Reservation confirmed"],
@@ -20,42 +27,156 @@ CONF_RE = r"(confirmation(?:\s|#|\snumber\s|\sno\.)?\s?:?\s?([A-Z0-9\-]{5,}))"
 HOTEL_RE = r"(hotel|stay|accommodation)\s?:?\s?([\w\s\-\'&,\.]{3,})"
 ACTIVITY_RE = r"(tour|activity|experience|ticket)\s?:?\s?([\w\s\-\'&,\.]{3,})"
 LOCATION_RE = r"(in|at|location)\s?:?\s?([\w\s\-\'&,\.]{3,})"
+QUOTED_RE = r'"([^"]{3,60})"'
 
+# Category keywords, checked in priority order; "activity" is the default
+CATEGORY_KEYWORDS = {
+    "lodging": ["hotel", "stay", "accommodation"],
+    "flight": ["flight", "airlines", "departure", "arrival"],
+    "transport": ["train", "bus", "transfer"],
+}
 
-def detect_provider(subject: str, sender: str, body: str) -> Optional[str]:
-    text = f"{subject} {sender} {body}".lower()
-    for prov, hints in PROVIDER_HINTS.items():
-        if any(h.lower() in text for h in hints):
+_CONF = re.compile(CONF_RE, re.IGNORECASE)
+_HOTEL = re.compile(HOTEL_RE, re.IGNORECASE)
+_ACTIVITY = re.compile(ACTIVITY_RE, re.IGNORECASE)
+_LOCATION = re.compile(LOCATION_RE, re.IGNORECASE)
+_QUOTED = re.compile(QUOTED_RE)
+_DATE = re.compile(DATE_RE, re.IGNORECASE)
+_TIME = re.compile(TIME_RE, re.IGNORECASE)
+_DIGIT = re.compile(r"\d")
+
+# The only non-ASCII characters IGNORECASE matches against ASCII letters
+# (U+0130 is also the only one whose lower() changes length). Text without
+# them can be prefiltered on its lowercase copy.
+_FOLD_SPECIAL = re.compile("[\u0130\u0131\u017f\u212a]")
+
+# Longest possible DATE_RE / TIME_RE match; every match contains a digit
+DATE_SPAN = 18
+TIME_SPAN = 8
+
+# Literal keywords every match of a keyword-led pattern starts with
+CONF_KEYWORDS = ("confirmation",)
+HOTEL_KEYWORDS = ("hotel", "stay", "accommodation")
+ACTIVITY_KEYWORDS = ("tour", "activity", "experience", "ticket")
+LOCATION_KEYWORDS = ("in", "at", "location")
+
+_PROVIDER_HINTS_LOW = {prov: tuple(h.lower() for h in hints) for prov, hints in PROVIDER_HINTS.items()}
+
+
+class ScannedText:
+    """A text plus the derived views its extractors share.
+
+    The lowercase copy and digit positions are built at most once. Keyword
+    prefiltering relies on keyword positions in the lowercase copy matching
+    IGNORECASE hits in the text, so it is skipped for the few characters
+    where that does not hold; such text is searched from the start.
+    """
+
+    __slots__ = ("text", "ascii", "foldsafe", "_low", "_digits")
+
+    def __init__(self, text: str, low: Optional[str] = None):
+        self.text = text
+        self.ascii = text.isascii()
+        self.foldsafe = self.ascii or not _FOLD_SPECIAL.search(text)
+        self._low = low
+        self._digits = None
+
+    @property
+    def low(self) -> str:
+        if self._low is None:
+            self._low = self.text.lower()
+        return self._low
+
+    def digits(self) -> List[int]:
+        if self._digits is None:
+            if self.ascii:
+                found = []
+                for ch in "0123456789":
+                    i = self.text.find(ch)
+                    while i != -1:
+                        found.append(i)
+                        i = self.text.find(ch, i + 1)
+                found.sort()
+            else:
+                found = [m.start() for m in _DIGIT.finditer(self.text)]
+            self._digits = found
+        return self._digits
+
+    def search(self, pattern: re.Pattern, keywords: Sequence[str], start: int = 0, end: Optional[int] = None):
+        """pattern.search over text[start:end], skipping ahead to the first keyword"""
+        end = len(self.text) if end is None else end
+        if self.foldsafe:
+            hits = [i for i in (self.low.find(k, start, end) for k in keywords) if i != -1]
+            if not hits:
+                return None
+            start = min(hits)
+        return pattern.search(self.text, start, end)
+
+    def findall_near_digits(self, pattern: re.Pattern, span: int) -> List[str]:
+        """pattern.findall for patterns whose matches contain a digit and are at
+        most `span` characters long: only windows around digits are scanned.
+        Windows closer than a match length are merged, so no match can cross
+        a window edge and leftmost non-overlapping order is preserved.
+        """
+        out = []
+        lo = hi = None
+        for d in self.digits():
+            w_lo, w_hi = max(0, d - span + 1), d + span
+            if hi is not None and w_lo <= hi:
+                hi = w_hi
+                continue
+            if hi is not None:
+                out.extend(pattern.findall(self.text, lo, hi))
+            lo, hi = w_lo, w_hi
+        if hi is not None:
+            out.extend(pattern.findall(self.text, lo, hi))
+        return out
+
+
+def _detect_provider_low(text_low: str) -> Optional[str]:
+    for prov, hints in _PROVIDER_HINTS_LOW.items():
+        if any(h in text_low for h in hints):
             return prov
     return None
 
 
-def extract_confirmation(text: str) -> Optional[str]:
-    m = re.search(CONF_RE, text, re.IGNORECASE)
+def _categorize_low(text_low: str) -> str:
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if any(k in text_low for k in keywords):
+            return category
+    return "activity"
+
+
+def detect_provider(subject: str, sender: str, body: str) -> Optional[str]:
+    return _detect_provider_low(f"{subject} {sender} {body}".lower())
+
+
+def _confirmation(st: ScannedText, start: int = 0, end: Optional[int] = None) -> Optional[str]:
+    m = st.search(_CONF, CONF_KEYWORDS, start, end)
     if m:
         return m.group(2).strip()
     return None
 
 
-def extract_title(text: str) -> Optional[str]:
+def _title(st: ScannedText) -> Optional[str]:
     # Try hotel then activity
-    m = re.search(HOTEL_RE, text, re.IGNORECASE)
+    m = st.search(_HOTEL, HOTEL_KEYWORDS)
     if m:
         return m.group(2).strip()
-    m = re.search(ACTIVITY_RE, text, re.IGNORECASE)
+    m = st.search(_ACTIVITY, ACTIVITY_KEYWORDS)
     if m:
         return m.group(2).strip()
     # Fallback: first quoted phrase or subject-like token
-    q = re.search(r'"([^"]{3,60})"', text)
+    q = _QUOTED.search(st.text)
     if q:
         return q.group(1).strip()
     return None
 
 
-def extract_dates(text: str):
+def _dates(st: ScannedText):
     # Look for two dates (range), or a single date optionally with times
-    dates = re.findall(DATE_RE, text, re.IGNORECASE)
-    times = re.findall(TIME_RE, text, re.IGNORECASE)
+    dates = st.findall_near_digits(_DATE, DATE_SPAN)
+    times = st.findall_near_digits(_TIME, TIME_SPAN)
     start_date = dates[0] if dates else None
     end_date = dates[1] if len(dates) > 1 else None
     start_time = times[0] if times else None
@@ -63,32 +184,49 @@ def extract_dates(text: str):
     return start_date, end_date, start_time, end_time
 
 
-def extract_location(text: str) -> Optional[str]:
-    m = re.search(LOCATION_RE, text, re.IGNORECASE)
+def _location(st: ScannedText, start: int = 0, end: Optional[int] = None) -> Optional[str]:
+    m = st.search(_LOCATION, LOCATION_KEYWORDS, start, end)
     if m:
         return m.group(2).strip()
     return None
 
 
+def extract_confirmation(text: str) -> Optional[str]:
+    return _confirmation(ScannedText(text))
+
+
+def extract_title(text: str) -> Optional[str]:
+    return _title(ScannedText(text))
+
+
+def extract_dates(text: str):
+    return _dates(ScannedText(text))
+
+
+def extract_location(text: str) -> Optional[str]:
+    return _location(ScannedText(text))
+
+
 def parse_email(subject: str, sender: str, body_text: str, provider_hint: Optional[str] = None) -> Optional[Dict]:
+    subj_low = subject.lower()
+    body_low = body_text.lower()
+
     # Decide provider
-    provider = (provider_hint or detect_provider(subject, sender, body_text) or "other").lower()
+    detected = None if provider_hint else _detect_provider_low(f"{subj_low} {sender.lower()} {body_low}")
+    provider = (provider_hint or detected or "other").lower()
 
     # Category heuristic
-    category = "activity"
-    subj_low = subject.lower()
-    body_low = body_text.lower()
-    if any(k in subj_low + body_low for k in ["hotel", "stay", "accommodation"]):
-        category = "lodging"
-    elif any(k in subj_low + body_low for k in ["flight", "airlines", "departure", "arrival"]):
-        category = "flight"
-    elif any(k in subj_low + body_low for k in ["train", "bus", "transfer"]):
-        category = "transport"
-
-    conf = extract_confirmation(subject + "\n" + body_text)
-    title = extract_title(subject + "\n" + body_text) or subject[:80]
-    loc = extract_location(body_text) or extract_location(subject) or None
-    d1, d2, t1, t2 = extract_dates(subject + "\n" + body_text)
+    category = _categorize_low(subj_low + body_low)
+
+    # Subject and body share one scanned buffer; body-only and subject-only
+    # searches are bounded slices of it
+    st = ScannedText(subject + "\n" + body_text, subj_low + "\n" + body_low)
+    body_at = len(subject) + 1
+
+    conf = _confirmation(st)
+    title = _title(st) or subject[:80]
+    loc = _location(st, body_at) or _location(st, 0, len(subject)) or None
+    d1, d2, t1, t2 = _dates(st)
 
     details = {
         "sender": sender,
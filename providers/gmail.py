@@ -1,5 +1,12 @@
 import base64
-from typing import List, Dict, Optional
+import binascii
+import codecs
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from typing import Callable, Iterable, Iterator, List, Dict, Optional
 
 from .email_parsers import parse_email
 
@@ -12,6 +19,18 @@ class GmailNotConfigured(Exception):
     pass
 
 
+# Parsing is CPU-bound regex work, so large batches are split into chunks and
+# parsed in a process pool. Small batches stay serial: below a few hundred
+# messages the pickling round trip costs more than it saves.
+PARSE_WORKERS = int(os.getenv("EMAIL_PARSE_WORKERS", "0")) or (os.cpu_count() or 1)
+PARSE_CHUNK_SIZE = int(os.getenv("EMAIL_PARSE_CHUNK_SIZE", "250"))
+PARSE_PARALLEL_MIN = int(os.getenv("EMAIL_PARSE_PARALLEL_MIN", "1000"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
 def decode_base64url(data: str) -> bytes:
     data += '=' * (-len(data) % 4)
     return base64.urlsafe_b64decode(data.encode('utf-8'))
@@ -29,26 +48,177 @@ def fetch_messages(account: dict, query: Optional[str] = None, raw_eml_list: Opt
     return []
 
 
-def extract_body_text(payload_parts: List[Dict]) -> str:
-    body = []
+def iter_messages(account: dict, query: Optional[str] = None, raw_eml_list: Optional[Iterable[Dict]] = None) -> Iterator[Dict]:
+    """
+    Streaming counterpart of fetch_messages: yields messages one at a time so
+    callers never hold a whole mailbox. A real Gmail client would page here.
+    """
+    if raw_eml_list is not None:
+        yield from raw_eml_list
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_reservation_batches(
+    messages: Iterable[Dict],
+    provider_hint: Optional[str] = None,
+    batch_size: int = 500,
+    on_parsed: Optional[Callable[[int], None]] = None,
+) -> Iterator[List[Dict]]:
+    """Parse messages and yield their reservations in batches of `batch_size`.
+
+    Messages are read parse_window() at a time, so with a process pool
+    configured each parse step is large enough to use it. Memory is bounded
+    by that window rather than by `batch_size`. `on_parsed` is called with
+    the number of messages in each parse step.
+    """
+    for chunk in batched(messages, parse_window(batch_size)):
+        reservations = messages_to_reservations(chunk, provider_hint=provider_hint)
+        if on_parsed is not None:
+            on_parsed(len(chunk))
+        for i in range(0, len(reservations), batch_size):
+            yield reservations[i:i + batch_size]
+
+
+def parse_window(batch_size: int, workers: Optional[int] = None) -> int:
+    """Messages read per parse step of iter_reservation_batches.
+
+    messages_to_reservations parses anything below EMAIL_PARSE_PARALLEL_MIN
+    serially. A window the size of one write batch (IMPORT_BATCH_SIZE, 500)
+    would therefore never reach the pool. With workers > 1 the window is
+    widened to the parallel threshold, and to at least one chunk per worker.
+    """
+    workers = PARSE_WORKERS if workers is None else workers
+    if workers <= 1:
+        return batch_size
+    return max(batch_size, PARSE_PARALLEL_MIN, workers * PARSE_CHUNK_SIZE)
+
+
+BODY_CHAR_BUDGET = 20000
+# Base64 characters decoded per step; a multiple of 4 so steps stay aligned
+BODY_DECODE_CHUNK = 16384
+_URLSAFE_TO_STD = bytes.maketrans(b"-_", b"+/")
+
+
+def decode_base64url_text(data: str, max_chars: int) -> str:
+    """Decode base64url UTF-8 text, stopping once `max_chars` are produced.
+
+    Fixed-size slices of the encoded string are encoded and decoded one at a
+    time through an incremental UTF-8 decoder, so a large part costs only as
+    much as the text actually kept.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    pieces: List[str] = []
+    produced = 0
+    try:
+        for start in range(0, len(data), BODY_DECODE_CHUNK):
+            chunk = data[start:start + BODY_DECODE_CHUNK].encode('utf-8').translate(_URLSAFE_TO_STD)
+            final = start + BODY_DECODE_CHUNK >= len(data)
+            if final:
+                chunk += b'=' * (-len(chunk) % 4)
+            text = decoder.decode(binascii.a2b_base64(chunk), final=final)
+            pieces.append(text)
+            produced += len(text)
+            if produced >= max_chars:
+                break
+    except binascii.Error:
+        # Stray non-alphabet characters can misalign the slices; fall back
+        # to decoding the whole part at once
+        return decode_base64url(data).decode('utf-8', errors='ignore')[:max_chars]
+    return "".join(pieces)[:max_chars]
+
+
+def extract_body_text(payload_parts: List[Dict], max_chars: int = BODY_CHAR_BUDGET) -> str:
+    """Body text of a Gmail payload, at most `max_chars` long.
+
+    text/plain parts are preferred; HTML is only used when a message has no
+    plain part. Other parts (attachments) are never decoded, and decoding
+    stops as soon as the budget is filled.
+    """
+    plain: List[str] = []
+    html: List[str] = []
     def walk(parts):
         for p in parts:
             mime = p.get('mimeType', '')
             data = p.get('body', {}).get('data')
             if data:
-                try:
-                    text = decode_base64url(data).decode('utf-8', errors='ignore')
-                    if mime.startswith('text/plain') or mime.startswith('text/html'):
-                        body.append(text)
-                except Exception:
-                    pass
+                if mime.startswith('text/plain'):
+                    plain.append(data)
+                elif mime.startswith('text/html'):
+                    html.append(data)
             if 'parts' in p:
                 walk(p['parts'])
     walk(payload_parts)
-    return "\n".join(body)[:20000]
+
+    body: List[str] = []
+    remaining = max_chars
+    for data in plain or html:
+        # A part after the first costs its joining newline, but only once it decodes
+        budget = remaining - 1 if body else remaining
+        if budget <= 0:
+            break
+        try:
+            text = decode_base64url_text(data, budget)
+        except Exception:
+            continue
+        body.append(text)
+        remaining = budget - len(text)
+    return "\n".join(body)[:max_chars]
+
+
+def _parse_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn, not fork: the server process holds driver threads and locks
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+def messages_to_reservations(
+    messages: List[Dict],
+    provider_hint: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> List[Dict]:
+    """Parse messages into reservation dicts, in input order.
+
+    Uses a process pool of `workers` (default EMAIL_PARSE_WORKERS, else the
+    CPU count) over chunks of `chunk_size` messages once the batch reaches
+    EMAIL_PARSE_PARALLEL_MIN; smaller batches are parsed in-process.
+    """
+    workers = PARSE_WORKERS if workers is None else workers
+    chunk_size = chunk_size or PARSE_CHUNK_SIZE
+    if workers <= 1 or len(messages) < max(PARSE_PARALLEL_MIN, chunk_size + 1):
+        return _parse_chunk(messages, provider_hint)
+
+    chunks = [messages[i:i + chunk_size] for i in range(0, len(messages), chunk_size)]
+    out: List[Dict] = []
+    # Executor.map yields results in submission order, so output is deterministic
+    for parsed in _parse_pool(workers).map(_parse_chunk, chunks, repeat(provider_hint)):
+        out.extend(parsed)
+    return out
 
 
-def messages_to_reservations(messages: List[Dict], provider_hint: Optional[str] = None) -> List[Dict]:
+def _parse_chunk(messages: List[Dict], provider_hint: Optional[str] = None) -> List[Dict]:
     out: List[Dict] = []
     for msg in messages:
         subject = msg.get('subject', '')
@@ -1,17 +1,24 @@
-from typing import List, Dict
-from .base import normalize, ProviderNotConfigured
+from datetime import datetime
+from typing import List, Dict, Optional
+import os
+from .base import normalize, fetch_normalized, filter_since, ProviderNotConfigured
 
+API_URL = os.getenv("KLOOK_API_URL", "")
 
-def fetch_reservations(account: Dict) -> List[Dict]:
+
+def fetch_reservations(account: Dict, since: Optional[datetime] = None) -> List[Dict]:
     token = account.get("access_token")
     if not token:
         raise ProviderNotConfigured("Klook access token missing")
-    return [
+    if API_URL:
+        return fetch_normalized(API_URL, "klook", token, category="activity", since=since)
+    return filter_since([
         normalize({
             "provider": "klook",
             "category": "activity",
             "title": "Hong Kong Disneyland Ticket",
             "location": "Hong Kong",
             "details": {"tickets": 2},
+            "provider_updated_at": "2025-01-08T16:45:00Z",
         })
-    ]
+    ], since)
@@ -1,17 +1,24 @@
-from typing import List, Dict
-from .base import normalize, ProviderNotConfigured
+from datetime import datetime
+from typing import List, Dict, Optional
+import os
+from .base import normalize, fetch_normalized, filter_since, ProviderNotConfigured
 
+API_URL = os.getenv("VIATOR_API_URL", "")
 
-def fetch_reservations(account: Dict) -> List[Dict]:
+
+def fetch_reservations(account: Dict, since: Optional[datetime] = None) -> List[Dict]:
     token = account.get("access_token")
     if not token:
         raise ProviderNotConfigured("Viator access token missing")
-    return [
+    if API_URL:
+        return fetch_normalized(API_URL, "viator", token, category="activity", since=since)
+    return filter_since([
         normalize({
             "provider": "viator",
             "category": "activity",
             "title": "Colosseum Guided Tour",
             "location": "Rome",
             "details": {"duration": "3h"},
+            "provider_updated_at": "2025-01-07T08:15:00Z",
         })
-    ]
+    ], since)
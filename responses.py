@@ -0,0 +1,43 @@
+"""
+Fast JSON Responses
+
+orjson-based encoding for API payloads. Datetimes, nested dicts and lists are
+serialized natively in C, ObjectIds are stringified on the way out, and
+anything else falls back to FastAPI's jsonable_encoder. Endpoints that return
+a FastJSONResponse directly skip FastAPI's generic jsonable_encoder walk
+entirely. Without orjson installed, the stdlib json module is used instead.
+"""
+
+import json
+from typing import Any
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON for API payloads"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -50,3 +50,5 @@ class Account(BaseModel):
     status: Literal["connected", "pending", "error"] = Field("pending")
     credentials_ref: Optional[str] = Field(None, description="Reference to stored credentials (external vault)")
     last_sync_at: Optional[datetime] = Field(None, description="Last time we synced from this account")
+    sync_cursor: Optional[str] = Field(None, description="Newest provider update seen (ISO time); delta syncs fetch changes after it")
+    sync_itinerary_id: Optional[str] = Field(None, description="Itinerary the sync cursor applies to")
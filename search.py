@@ -0,0 +1,87 @@
+"""
+Reservation Search
+
+Maintains a `search_tokens` array on each reservation (lowercased words from
+title, location and provider). A multikey index on
+(itinerary_id, search_tokens) lets a query term be answered as an anchored
+prefix range scan instead of a per-row substring test, so lookups stay flat as
+an itinerary grows.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+SEARCH_FIELDS = ("title", "location", "provider")
+# Ranking happens in memory, so it only sees a bounded candidate set: the
+# first `limit * SEARCH_CANDIDATE_FACTOR` matches in start_time order, never
+# more than SEARCH_MAX_CANDIDATES. Responses ranked from a cut-short set carry
+# an X-Truncated header.
+SEARCH_CANDIDATE_FACTOR = int(os.getenv("SEARCH_CANDIDATE_FACTOR", "10"))
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "5000"))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into unique lowercase tokens, preserving first-seen order"""
+    seen = {}
+    for tok in TOKEN_RE.findall(text.lower()):
+        seen.setdefault(tok, None)
+    return list(seen)
+
+
+def search_tokens(doc: Dict) -> List[str]:
+    """Tokens indexed for a reservation document"""
+    return tokenize(" ".join(str(doc.get(f) or "") for f in SEARCH_FIELDS))
+
+
+def with_search_tokens(doc: Dict) -> Dict:
+    """Return a copy of `doc` carrying its search tokens"""
+    return {**doc, "search_tokens": search_tokens(doc)}
+
+
+def build_search_clauses(q: str) -> List[Dict]:
+    """Mongo clauses (to be ANDed) matching every query term as a token prefix.
+
+    Returns an empty list when the query has no word characters; callers fall
+    back to a plain substring match in that case.
+    """
+    return [{"search_tokens": {"$regex": "^" + re.escape(t)}} for t in tokenize(q)]
+
+
+def candidate_limit(limit: Optional[int]) -> int:
+    """Number of matches fetched for ranking a page of `limit` results"""
+    if not limit:
+        return SEARCH_MAX_CANDIDATES
+    return max(limit, min(limit * SEARCH_CANDIDATE_FACTOR, SEARCH_MAX_CANDIDATES))
+
+
+def rank(docs: List[Dict], q: str) -> List[Dict]:
+    """Order matches by relevance: exact token hits outrank prefix-only hits.
+
+    The sort is stable, so ties keep the cursor order (start_time).
+    """
+    terms = tokenize(q)
+
+    def score(doc: Dict) -> int:
+        tokens = set(doc.get("search_tokens") or ())
+        return sum(2 if t in tokens else 1 for t in terms)
+
+    return sorted(docs, key=score, reverse=True)
+
+
+async def backfill_search_tokens(collection, batch_size: int = 500) -> int:
+    """Populate `search_tokens` on reservations created before search existed"""
+    updated = 0
+    ops = []
+    projection = {f: 1 for f in SEARCH_FIELDS}
+    async for doc in collection.find({"search_tokens": {"$exists": False}}, projection):
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"search_tokens": search_tokens(doc)}}))
+        if len(ops) >= batch_size:
+            updated += (await collection.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        updated += (await collection.bulk_write(ops, ordered=False)).modified_count
+    return updated
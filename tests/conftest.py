@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# The app is a set of top-level modules; make them importable from tests/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def memory_db():
+    """In-memory stand-in for the async database (mongomock-motor)"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import async_database
+
+    previous = async_database.db
+    async_database.db = mongomock_motor.AsyncMongoMockClient()["test"]
+    yield async_database.db
+    async_database.db = previous
@@ -0,0 +1,37 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client(monkeypatch, tmp_path):
+    httpx = pytest.importorskip("httpx")
+    import main
+    import profiling
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.parametrize("token, status", [
+    (b"s3cret", 200),
+    (b"wrong", 401),
+    (b"\xe9", 401),
+    (b"s3cret\xe9", 401),
+    (None, 401),
+])
+async def test_admin_token_is_checked(client, token, status):
+    headers = {"X-Admin-Token": token} if token is not None else {}
+    resp = await client.get("/api/admin/profiles", headers=headers)
+    assert resp.status_code == status
+
+
+async def test_admin_endpoints_are_hidden_without_a_token(client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+    resp = await client.get("/api/admin/profiles", headers={"X-Admin-Token": "anything"})
+    assert resp.status_code == 404
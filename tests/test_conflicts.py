@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from conflicts import find_conflicts
+from timeline import build_timeline
+
+pytestmark = pytest.mark.anyio
+
+
+def reservation(category, start, end=None, **extra):
+    # Every timeline field is set: mongomock drops a $push-ed object that
+    # references a missing field
+    return {"_id": ObjectId(), "title": category, "category": category, "provider": "viator",
+            "location": "Lisbon", "confirmation_number": None, "start_time": start, "end_time": end, **extra}
+
+
+def test_overlapping_activities_conflict_and_lodging_does_not():
+    docs = [
+        reservation("lodging", datetime(2025, 3, 1, 15), datetime(2025, 3, 4, 11)),
+        reservation("activity", datetime(2025, 3, 2, 9), datetime(2025, 3, 2, 12)),
+        reservation("activity", datetime(2025, 3, 2, 11), datetime(2025, 3, 2, 13)),
+    ]
+    result = find_conflicts(docs)
+    assert result["count"] == 1
+    assert result["conflicts"][0]["kind"] == "schedule"
+
+
+def test_string_times_are_skipped():
+    docs = [
+        # BSON sorts strings before dates, so these arrive first
+        reservation("activity", "2025-03-02T10:00:00Z", "2025-03-02T12:00:00Z"),
+        reservation("activity", datetime(2025, 3, 2, 9), "2025-03-02T12:00:00Z"),
+        reservation("activity", datetime(2025, 3, 2, 9), datetime(2025, 3, 2, 12)),
+    ]
+    result = find_conflicts(docs)
+    assert result["count"] == 1
+
+
+async def test_conflicts_and_timeline_ignore_string_start_times(memory_db):
+    httpx = pytest.importorskip("httpx")
+    import main
+
+    itinerary = {"_id": ObjectId(), "name": "Trip",
+                 "start_date": datetime(2025, 3, 1), "end_date": datetime(2025, 3, 5)}
+    await memory_db["itinerary"].insert_one(itinerary)
+    iid = str(itinerary["_id"])
+    await memory_db["reservation"].insert_many([
+        reservation("activity", "2025-03-02T10:00:00Z", "2025-03-02T12:00:00Z", itinerary_id=iid, title="Legacy"),
+        reservation("activity", datetime(2025, 3, 2, 9), datetime(2025, 3, 2, 11), itinerary_id=iid, title="Tour"),
+        reservation("activity", datetime(2025, 3, 2, 10), datetime(2025, 3, 2, 12), itinerary_id=iid, title="Museum"),
+    ])
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(f"/api/itineraries/{iid}/conflicts")
+    assert resp.status_code == 200
+    assert resp.json()["count"] == 1
+
+    timeline = await build_timeline(memory_db, itinerary, "UTC")
+    titles = [item["title"] for day in timeline["days"] for item in day["items"]]
+    assert titles == ["Tour", "Museum"]
@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks.date_parser import make_hints, strptime_parse
+from providers import date_parser
+from providers.email_parsers import parse_email
+
+# (hint, expected start datetime): every shape DATE_RE/TIME_RE can produce
+CORPUS = [
+    ("2025-03-12 None", datetime(2025, 3, 12)),
+    ("2025-03-12 10:30", datetime(2025, 3, 12, 10, 30)),
+    ("2025-03-12 9:05 AM", datetime(2025, 3, 12, 9, 5)),
+    ("12 March 2025 None", datetime(2025, 3, 12)),
+    ("12 March 2025 3:00 PM", datetime(2025, 3, 12, 15, 0)),
+    ("1 Mar 2025 12:00 AM", datetime(2025, 3, 1, 0, 0)),
+    ("1 Mar 2025 12:30 PM", datetime(2025, 3, 1, 12, 30)),
+    ("3 Sept 2025 None", datetime(2025, 9, 3)),
+    ("3 SEPTEMBER 2025 18:45", datetime(2025, 9, 3, 18, 45)),
+    ("March 12, 2025 None", datetime(2025, 3, 12)),
+    ("March 12, 2025 3:00PM", datetime(2025, 3, 12, 15, 0)),
+    ("dec 31, 2025 11:59 pm", datetime(2025, 12, 31, 23, 59)),
+    ("Feb 29, 2024 None", datetime(2024, 2, 29)),
+    ("12\nMarch\n2025 7:00", datetime(2025, 3, 12, 7, 0)),
+    ("2025-03-12T10:00:00", datetime(2025, 3, 12, 10, 0)),
+    ("2025-03-12T10:00:00Z", datetime(2025, 3, 12, 10, 0, tzinfo=timezone.utc)),
+    # Unplaceable or invalid
+    ("None 10:30", None),
+    ("Feb 29, 2025 None", None),
+    ("2025-13-01 None", None),
+    ("12 guests 2025 None", None),
+    ("Checkin 12, 2025 None", None),
+    ("2025-03-12 25:00", datetime(2025, 3, 12)),
+    ("2025-03-12 13:00 PM", datetime(2025, 3, 12)),
+    ("", None),
+]
+
+# (start hint, end hint, expected end)
+PAIR_CORPUS = [
+    ("2025-03-12 10:00", "None 5:00 PM", datetime(2025, 3, 12, 17, 0)),
+    ("12 March 2025 None", "14 March 2025 None", datetime(2025, 3, 14)),
+    (None, "None 5:00 PM", None),
+]
+
+
+@pytest.mark.parametrize("hint, expected", CORPUS)
+def test_parse_hint(hint, expected):
+    assert date_parser.parse_hint(hint) == expected
+
+
+@pytest.mark.parametrize("start, end, expected", PAIR_CORPUS)
+def test_parse_hint_pair_end(start, end, expected):
+    assert date_parser.parse_hint_pair(start, end)[1] == expected
+
+
+def test_hint_as_parse_email_renders_it():
+    r = parse_email("Your booking", "x@booking.com", "Check-in 12 March 2025 3:00 PM until 14 March 2025")
+    assert date_parser.parse_hint(r["start_time_hint"]) == datetime(2025, 3, 12, 15, 0)
+
+
+def test_batch_parse_agrees_with_strptime():
+    hints = make_hints(2000, seed=7)
+    parsed = date_parser.parse_hint_pairs([(h, None) for h in hints])
+    assert [start for start, _ in parsed] == [strptime_parse(h) for h in hints]
@@ -0,0 +1,41 @@
+"""
+Regression corpus for parse_email.
+
+data/parse_email_corpus.jsonl holds one message per line with the output the
+original, uncompiled parse_email gave for it. The outputs are frozen: a
+mismatch means the parser changed behaviour, not that the file is stale.
+Cases cover each provider and category, the extractors' fallbacks, non-ASCII
+text and digits, and the characters IGNORECASE folds onto ASCII letters
+(U+0130, U+0131, U+017F, U+212A), where ScannedText must not prefilter on its
+lowercase copy. "random-*" cases are keyword-dense word salad; "generated-*"
+cases come from benchmarks.generators.
+"""
+
+import json
+import os
+
+import pytest
+
+from providers.email_parsers import ScannedText, parse_email
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "parse_email_corpus.jsonl")
+
+with open(CORPUS_PATH, encoding="utf-8") as f:
+    CORPUS = [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[c["name"] for c in CORPUS])
+def test_parse_email_matches_frozen_output(case):
+    result = parse_email(case["subject"], case["sender"], case["body_text"], case["provider_hint"])
+    assert result == case["expected"]
+
+
+@pytest.mark.parametrize("char", ["İ", "ı", "ſ", "K"])
+def test_fold_special_text_is_not_prefiltered(char):
+    assert not ScannedText(f"tour {char} 2025-01-01").foldsafe
+    assert any(char in c["subject"] + c["sender"] + c["body_text"] for c in CORPUS)
+
+
+def test_other_non_ascii_text_is_prefiltered():
+    st = ScannedText("Hôtel: Le Méridien, Zürich ٢٠٢٥-٠٣-٠١")
+    assert not st.ascii and st.foldsafe
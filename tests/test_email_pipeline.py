@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.generators import make_emails
+from importer import import_from_email
+from providers import gmail
+from providers.email_import import iter_gmail_reservation_batches, normalize_email_reservations
+
+pytestmark = pytest.mark.anyio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CountingPool(ThreadPoolExecutor):
+    """Stands in for the process pool; records how many chunks it parsed"""
+
+    chunks = 0
+
+    def map(self, fn, *iterables):
+        chunks = list(iterables[0])
+        CountingPool.chunks += len(chunks)
+        return super().map(fn, chunks, *iterables[1:])
+
+
+@pytest.fixture
+def counting_pool(monkeypatch):
+    pool = CountingPool(max_workers=4)
+    CountingPool.chunks = 0
+    monkeypatch.setattr(gmail, "PARSE_WORKERS", 4)
+    monkeypatch.setattr(gmail, "_parse_pool", lambda workers: pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_parse_window_reaches_parallel_threshold():
+    assert gmail.parse_window(500, workers=1) == 500
+    assert gmail.parse_window(500, workers=4) >= gmail.PARSE_PARALLEL_MIN
+
+
+def test_pipeline_batches_use_the_parse_pool(counting_pool):
+    messages = make_emails(3000, 7)
+    batches = list(iter_gmail_reservation_batches({}, raw_messages=iter(messages), batch_size=500))
+
+    assert CountingPool.chunks > 0
+    assert all(len(b) <= 500 for b in batches)
+    serial = normalize_email_reservations(gmail.messages_to_reservations(messages, workers=1))
+    assert [r for b in batches for r in b] == serial
+
+
+async def test_email_import_uses_the_parse_pool(memory_db, counting_pool):
+    result = await import_from_email(
+        "665f1c2e8b3e4a0012345678", {}, raw_messages=make_emails(1200, 7), keep_items=False
+    )
+    assert CountingPool.chunks > 0
+    assert result["created"] == 1200
+
+
+# Runs in a fresh interpreter so ru_maxrss reflects only this import. Writes
+# are counted instead of stored: the database's own memory is not under test.
+RSS_SCRIPT = """
+import asyncio, json, resource, sys
+import importer
+from benchmarks.generators import iter_emails
+
+saved = 0
+
+async def save_import_items(itinerary_id, batch):
+    global saved
+    saved += len(batch)
+    return {"created": len(batch), "updated": 0, "unchanged": 0, "duplicate": 0}, [], []
+
+async def bump(*keys):
+    pass
+
+importer.save_import_items = save_import_items
+importer.bump = bump
+count = int(sys.argv[1])
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+result = asyncio.run(importer.import_from_email("it", {}, raw_messages=iter_emails(count), keep_items=False))
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"saved": saved, "created": result["created"], "growth_kb": after - before}))
+"""
+
+MAILBOX_SIZE = 100_000
+RSS_CEILING_KB = 64 * 1024
+
+
+def test_100k_message_import_has_bounded_memory():
+    pytest.importorskip("resource")
+    env = {**os.environ, "EMAIL_PARSE_WORKERS": "1", "PYTHONPATH": ROOT}
+    proc = subprocess.run(
+        [sys.executable, "-c", RSS_SCRIPT, str(MAILBOX_SIZE)],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=600,
+    )
+    assert proc.returncode == 0, proc.stderr
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    assert report["saved"] == report["created"] == MAILBOX_SIZE
+    # A materialized 100k-message mailbox alone is several hundred MB
+    assert report["growth_kb"] < RSS_CEILING_KB, report
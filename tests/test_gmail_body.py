@@ -0,0 +1,56 @@
+import base64
+
+import pytest
+
+from providers import gmail
+from providers.gmail import decode_base64url, extract_body_text
+
+
+def b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def part(mime: str, text: str) -> dict:
+    return {"mimeType": mime, "body": {"data": b64(text)}}
+
+
+def decode_all(parts, max_chars=20000) -> str:
+    """The pre-budget path: decode every part with data whole, join, then truncate"""
+    texts = [decode_base64url(p["body"]["data"]).decode("utf-8", errors="ignore") for p in parts if p["body"]["data"]]
+    return "\n".join(texts)[:max_chars]
+
+
+def test_plain_text_is_preferred_over_html():
+    parts = [{"mimeType": "multipart/alternative", "parts": [
+        part("text/plain", "plain body"),
+        part("text/html", "<p>html body</p>"),
+    ]}, part("application/pdf", "%PDF")]
+    assert extract_body_text(parts) == "plain body"
+
+
+def test_html_is_used_without_a_plain_part():
+    assert extract_body_text([part("text/html", "<p>only html</p>")]) == "<p>only html</p>"
+
+
+def test_undecodable_part_does_not_consume_the_newline_budget():
+    parts = [
+        part("text/plain", "a" * 10000),
+        {"mimeType": "text/plain", "body": {"data": "A"}},  # not valid base64
+        part("text/plain", "b" * 15000),
+    ]
+    body = extract_body_text(parts)
+    assert len(body) == 20000
+    assert body == decode_all([parts[0], parts[2]])
+
+
+@pytest.mark.parametrize("max_chars", [1, 7, 4999, 20000, 100000])
+def test_budgeted_decode_matches_decoding_everything(max_chars, monkeypatch):
+    # Small slices so multi-byte characters straddle slice boundaries
+    monkeypatch.setattr(gmail, "BODY_DECODE_CHUNK", 64)
+    parts = [
+        part("text/plain", "Grüße aus Zürich — 東京 🚤 " * 200),
+        part("text/plain", ""),
+        part("text/plain", "second part " * 300),
+    ]
+    assert extract_body_text(parts, max_chars) == decode_all(parts, max_chars)
+
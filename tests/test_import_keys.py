@@ -0,0 +1,58 @@
+import pytest
+
+from importer import import_from_email, import_key, save_import_items
+
+pytestmark = pytest.mark.anyio
+
+ITINERARY_ID = "665f1c2e8b3e4a0012345678"
+
+
+def booking_email(n: int) -> dict:
+    return {
+        "subject": f"Booking.com hotel: Hotel {n}",
+        "from": "noreply@booking.com",
+        "body_text": f"Confirmation number: BK-{n:06d} check-in 2024-05-0{n}",
+    }
+
+
+def test_email_confirmation_without_digits_is_not_a_key():
+    item = {"provider": "booking.com", "confirmation_number": "number", "source": "email", "title": "A"}
+    assert import_key(item).startswith("hash:")
+    assert import_key({**item, "confirmation_number": "BK-123456"}) == "BK-123456"
+    # Connector-supplied numbers are trusted as they are
+    assert import_key({**item, "source": "api"}) == "number"
+
+
+async def test_distinct_emails_with_keyword_confirmation_are_all_stored(memory_db):
+    result = await import_from_email(ITINERARY_ID, {}, raw_messages=[booking_email(n) for n in (1, 2, 3)])
+    assert result["created"] == 3
+    assert await memory_db["reservation"].count_documents({}) == 3
+
+    again = await import_from_email(ITINERARY_ID, {}, raw_messages=[booking_email(n) for n in (1, 2, 3)])
+    assert again["unchanged"] == 3
+    assert await memory_db["reservation"].count_documents({}) == 3
+
+
+async def test_generated_mailbox_stores_every_booking(memory_db):
+    from benchmarks.generators import make_emails
+
+    result = await import_from_email(ITINERARY_ID, {}, raw_messages=make_emails(100, 7), keep_items=False)
+    assert result["created"] == 100
+    assert result["duplicate"] == 0
+
+
+async def test_in_batch_duplicate_key_is_reported(memory_db):
+    items = [
+        {"provider": "agoda", "title": "First", "confirmation_number": "AG-1", "source": "api"},
+        {"provider": "agoda", "title": "Other", "confirmation_number": "AG-2", "source": "api"},
+        {"provider": "agoda", "title": "Second", "confirmation_number": "AG-1", "source": "api"},
+    ]
+    counts, saved, failed = await save_import_items(ITINERARY_ID, items)
+
+    assert counts == {"created": 2, "updated": 0, "unchanged": 0, "duplicate": 1}
+    assert not failed
+    first, _, second = saved
+    assert first["status"] == "duplicate"
+    assert first["id"] == second["id"] is not None
+    stored = await memory_db["reservation"].find_one({"import_key": "AG-1"})
+    assert stored["title"] == "Second"
@@ -0,0 +1,97 @@
+"""
+Explain-based checks that the reservation list filters are answered from an
+index. mongomock has no query planner, so these need a real MongoDB: set
+DATABASE_URL (a throwaway database is created and dropped).
+"""
+
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="DATABASE_URL not set")
+
+ITINERARY_ID = "665f1c2e8b3e4a0012345678"
+CATEGORIES = ("lodging", "activity", "flight", "transport")
+
+
+@pytest.fixture(scope="module")
+def reservations():
+    from pymongo import MongoClient
+
+    from db_common import RESERVATION_INDEXES
+    from search import with_search_tokens
+
+    client = MongoClient(DATABASE_URL, serverSelectionTimeoutMS=5000)
+    name = f"test_indexes_{uuid.uuid4().hex[:8]}"
+    collection = client[name]["reservation"]
+    for keys in RESERVATION_INDEXES:
+        collection.create_index(keys)
+
+    base = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    docs = []
+    for i in range(2000):
+        start = base + timedelta(hours=i)
+        docs.append(with_search_tokens({
+            "itinerary_id": ITINERARY_ID if i % 2 else "665f1c2e8b3e4a0087654321",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "provider": "booking.com" if i % 3 else "viator",
+            "title": f"Grand Hotel {i}" if i % 5 else f"City Tour {i}",
+            "location": "Lisbon",
+            "start_time": start,
+            "end_time": start + timedelta(hours=2),
+        }))
+    collection.insert_many(docs)
+    yield collection
+    client.drop_database(name)
+    client.close()
+
+
+def plan_stages(explain) -> set:
+    """Every stage name in the winning plan (classic and SBE layouts)"""
+    stages = set()
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "stage" in node:
+                stages.add(node["stage"])
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(explain["queryPlanner"]["winningPlan"])
+    return stages
+
+
+def explain_list_query(collection, **filters) -> set:
+    from main import build_reservation_filter
+    from pagination import sort_spec
+
+    query = build_reservation_filter(ITINERARY_ID, **filters)
+    return plan_stages(collection.find(query).sort(sort_spec("start_time")).limit(50).explain())
+
+
+def test_category_window_uses_index(reservations):
+    start = datetime(2024, 6, 10, tzinfo=timezone.utc)
+    stages = explain_list_query(
+        reservations, category="lodging", start=start, end=start + timedelta(days=7)
+    )
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+
+
+def test_provider_filter_uses_index(reservations):
+    stages = explain_list_query(reservations, provider="viator")
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+
+
+def test_search_uses_index(reservations):
+    stages = explain_list_query(reservations, q="grand")
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
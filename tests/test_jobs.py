@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+import jobs
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def job_queue(memory_db, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_STALE_SECONDS", 0.2)
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_SECONDS", 0.05)
+    monkeypatch.setattr(jobs, "JOB_WORKERS", 2)
+    await jobs.start()
+    yield memory_db[jobs.JOB_COLLECTION]
+    await jobs.stop()
+
+
+async def wait_for_status(job_id: str, status: str, timeout: float = 5.0) -> dict:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await jobs.get_job(job_id)
+        if job["status"] == status:
+            return job
+        assert asyncio.get_running_loop().time() < deadline, job
+        await asyncio.sleep(0.02)
+
+
+async def test_long_fetch_is_not_requeued_while_running(job_queue):
+    runs = []
+
+    async def slow_runner(payload, on_batch):
+        runs.append(payload)
+        # A fetch much longer than the stale window before the first batch
+        await asyncio.sleep(0.8)
+        await on_batch({"processed": 3, "created": 3, "updated": 0, "unchanged": 0, "duplicate": 0, "failed": []})
+        return {}
+
+    jobs.register("slow", slow_runner)
+    job_id = await jobs.submit("slow", {})
+    await wait_for_status(job_id, "running")
+    for _ in range(3):
+        await asyncio.sleep(0.25)
+        await jobs._requeue_pending()
+
+    job = await wait_for_status(job_id, "succeeded")
+    assert len(runs) == 1
+    assert job["processed"] == 3 and job["created"] == 3
+    assert "run_id" not in job
+
+
+async def test_job_orphaned_by_another_process_is_requeued(job_queue):
+    done = []
+
+    async def runner(payload, on_batch):
+        done.append(payload["n"])
+        return {}
+
+    jobs.register("orphan", runner)
+    stale = datetime.now(timezone.utc) - timedelta(seconds=10)
+    oid = ObjectId()
+    await job_queue.insert_one({
+        "_id": oid, "kind": "orphan", "payload": {"n": 1}, "status": "running",
+        "run_id": ObjectId(), "updated_at": stale,
+    })
+    await jobs._requeue_pending()
+    await wait_for_status(str(oid), "succeeded")
+    assert done == [1]
+
+
+async def test_reaper_does_not_requeue_the_local_backlog(job_queue):
+    release = asyncio.Event()
+    runs = []
+
+    async def runner(payload, on_batch):
+        runs.append(payload["n"])
+        await release.wait()
+        return {}
+
+    jobs.register("backlog", runner)
+    ids = [await jobs.submit("backlog", {"n": n}) for n in range(5)]
+    await wait_for_status(ids[1], "running")
+    # Queued by another process: picked up once, by the first pass
+    other = ObjectId()
+    await job_queue.insert_one({"_id": other, "kind": "backlog", "payload": {"n": 5}, "status": "queued"})
+
+    for _ in range(3):
+        await jobs._requeue_pending()
+    assert jobs._queue.qsize() == 4
+
+    release.set()
+    for job_id in [*ids, str(other)]:
+        await wait_for_status(job_id, "succeeded")
+    assert sorted(runs) == [0, 1, 2, 3, 4, 5]
+
+
+async def test_superseded_run_cannot_write(job_queue):
+    release = asyncio.Event()
+
+    async def runner(payload, on_batch):
+        await release.wait()
+        await on_batch({"processed": 5, "created": 5, "updated": 0, "unchanged": 0, "duplicate": 0, "failed": []})
+        return {}
+
+    jobs.register("fenced", runner)
+    job_id = await jobs.submit("fenced", {})
+    await wait_for_status(job_id, "running")
+    # Another worker took the job over (e.g. after a partition)
+    await job_queue.update_one({"_id": ObjectId(job_id)}, {"$set": {"run_id": ObjectId(), "status": "running"}})
+    release.set()
+    while job_id in jobs._active:
+        await asyncio.sleep(0.01)
+
+    # Checked before the reaper can treat the takeover's silent job as orphaned
+    job = await jobs.get_job(job_id)
+    assert job["status"] == "running"
+    assert job["processed"] == 0
+
+
+async def test_secret_fields_are_removed_when_the_job_finishes(job_queue):
+    seen = []
+
+    async def runner(payload, on_batch):
+        seen.append(payload.get("access_token"))
+        return {}
+
+    jobs.register("secret", runner, secret_fields=("access_token",))
+    job_id = await jobs.submit("secret", {"itinerary_id": "x", "access_token": "tok"})
+    await wait_for_status(job_id, "succeeded")
+
+    stored = await job_queue.find_one({"_id": ObjectId(job_id)})
+    assert seen == ["tok"]
+    assert stored["payload"] == {"itinerary_id": "x"}
+
+
+async def test_oversized_payload_is_rejected(memory_db, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_MAX_PAYLOAD_BYTES", 1024)
+    jobs.register("big", lambda payload, on_batch: None)
+    with pytest.raises(jobs.PayloadTooLarge):
+        await jobs.submit("big", {"messages": [{"body_text": "x" * 2048}]})
+    assert await memory_db[jobs.JOB_COLLECTION].count_documents({}) == 0
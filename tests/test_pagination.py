@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+pytestmark = pytest.mark.anyio
+
+ITINERARY_ID = "665f1c2e8b3e4a0012345678"
+
+
+@pytest.fixture
+async def client(memory_db):
+    httpx = pytest.importorskip("httpx")
+    import main
+
+    main.itinerary_cache.clear()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def walk(client, url, limit):
+    """Every id over all pages, following X-Next-Cursor"""
+    ids, params = [], {"limit": limit}
+    while True:
+        resp = await client.get(url, params=params)
+        assert resp.status_code == 200
+        page = resp.json()
+        assert len(page) <= limit
+        ids.extend(doc["id"] for doc in page)
+        cursor = resp.headers.get("x-next-cursor")
+        if not cursor:
+            return ids
+        params = {"limit": limit, "after": cursor}
+
+
+async def test_reservation_pages_cover_every_document_once(client, memory_db):
+    base = datetime(2025, 3, 1, 9)
+    docs = []
+    for i in range(53):
+        # Repeated start times and unscheduled reservations exercise the _id tiebreak
+        start = None if i % 10 == 0 else base + timedelta(hours=i // 3)
+        docs.append({"_id": ObjectId(), "itinerary_id": ITINERARY_ID, "title": f"R{i}", "start_time": start})
+    await memory_db["reservation"].insert_many(docs)
+
+    ids = await walk(client, f"/api/itineraries/{ITINERARY_ID}/reservations", limit=7)
+
+    expected = sorted(docs, key=lambda d: (d["start_time"] is not None, d["start_time"] or base, d["_id"]))
+    assert ids == [str(d["_id"]) for d in expected]
+
+
+async def test_itinerary_pages_cover_every_document_once(client, memory_db):
+    docs = [{"_id": ObjectId(), "name": f"Trip {i}"} for i in range(20)]
+    await memory_db["itinerary"].insert_many(docs)
+
+    ids = await walk(client, "/api/itineraries", limit=6)
+
+    assert ids == sorted(str(d["_id"]) for d in docs)
+
+
+async def test_cursor_header_is_exposed_to_browsers(client, memory_db):
+    await memory_db["itinerary"].insert_many([{"name": "a"}, {"name": "b"}])
+
+    resp = await client.get("/api/itineraries", params={"limit": 1}, headers={"Origin": "https://app.example"})
+
+    assert "x-next-cursor" in resp.headers
+    exposed = {h.strip().lower() for h in resp.headers["access-control-expose-headers"].split(",")}
+    assert {"x-next-cursor", "etag"} <= exposed
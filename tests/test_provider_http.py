@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from providers import base
+
+
+class StubProvider(BaseHTTPRequestHandler):
+    """Replays scripted (status, body, headers, delay) responses per path"""
+
+    protocol_version = "HTTP/1.1"
+    script = {}
+    seen = []
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        StubProvider.seen.append((parts.path, parse_qs(parts.query), self.client_address[1]))
+        queue = StubProvider.script.get(parts.path) or [(404, {"error": "not found"}, {}, 0)]
+        status, body, headers, delay = queue.pop(0) if len(queue) > 1 else queue[0]
+        time.sleep(delay)
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    monkeypatch.setattr(base, "HTTP_BACKOFF_BASE", 0.01)
+    StubProvider.script = {}
+    StubProvider.seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubProvider)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    base.close_sessions()
+    server.shutdown()
+    server.server_close()
+
+
+def respond(path, *responses):
+    StubProvider.script[path] = [
+        (r[0], r[1], r[2] if len(r) > 2 else {}, r[3] if len(r) > 3 else 0) for r in responses
+    ]
+
+
+def test_429_is_retried_after_retry_after(provider):
+    respond("/r", (429, {}, {"Retry-After": "0"}), (200, {"ok": True}))
+    assert base.request_json("GET", provider + "/r") == {"ok": True}
+    assert len(StubProvider.seen) == 2
+
+
+def test_retries_stop_after_max_retries(provider):
+    respond("/r", (503, {}))
+    with pytest.raises(base.ProviderAPIError) as info:
+        base.request_json("GET", provider + "/r", max_retries=2)
+    assert info.value.status == 503
+    assert len(StubProvider.seen) == 3
+
+
+def test_client_errors_are_not_retried(provider):
+    respond("/r", (401, {"error": "bad token"}))
+    with pytest.raises(base.ProviderAPIError) as info:
+        base.request_json("GET", provider + "/r")
+    assert info.value.status == 401
+    assert len(StubProvider.seen) == 1
+
+
+def test_slow_response_times_out_then_retries(provider):
+    respond("/r", (200, {"late": True}, {}, 0.5), (200, {"ok": True}))
+    started = time.monotonic()
+    assert base.request_json("GET", provider + "/r", timeout=0.1, max_retries=1) == {"ok": True}
+    assert time.monotonic() - started < 0.5
+
+
+def test_paging_normalizes_and_reuses_the_connection(provider):
+    respond("/reservations",
+            (200, {"items": [{"title": "A", "start_time": "2025-03-01T10:00:00Z",
+                              "end_time": "2025-03-01T12:00:00+02:00",
+                              "provider_updated_at": "2025-02-01T00:00:00Z"}],
+                   "next_cursor": "p2"}),
+            (200, {"items": [{"title": "B", "start_time": "2025-03-02"}], "next_cursor": None}))
+    since = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    items = base.fetch_normalized(provider, "viator", "tok", category="activity", since=since)
+
+    assert [i["title"] for i in items] == ["A", "B"]
+    assert items[0]["start_time"] == datetime(2025, 3, 1, 10, tzinfo=timezone.utc)
+    assert items[0]["end_time"] == datetime(2025, 3, 1, 10, tzinfo=timezone.utc)
+    assert items[1]["start_time"] == datetime(2025, 3, 2, tzinfo=timezone.utc)
+    assert all(i["provider"] == "viator" and i["category"] == "activity" for i in items)
+
+    (_, first, port1), (_, second, port2) = StubProvider.seen
+    assert first["updated_since"] == [since.isoformat()]
+    assert second["cursor"] == ["p2"]
+    assert port1 == port2
@@ -0,0 +1,45 @@
+import pytest
+
+import search
+from search import with_search_tokens
+
+pytestmark = pytest.mark.anyio
+
+ITINERARY_ID = "665f1c2e8b3e4a0012345678"
+
+
+@pytest.fixture
+async def client(memory_db, monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    import main
+
+    monkeypatch.setattr(search, "SEARCH_MAX_CANDIDATES", 5)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def add_hotels(memory_db, count):
+    await memory_db["reservation"].insert_many([
+        with_search_tokens({"itinerary_id": ITINERARY_ID, "title": f"Hotel {i}", "provider": "booking.com"})
+        for i in range(count)
+    ])
+
+
+async def test_search_past_the_candidate_cap_is_flagged(client, memory_db):
+    await add_hotels(memory_db, 8)
+
+    resp = await client.get(f"/api/itineraries/{ITINERARY_ID}/reservations", params={"q": "hotel"})
+
+    assert resp.status_code == 200
+    assert len(resp.json()) == 5
+    assert resp.headers["x-truncated"] == "true"
+
+
+async def test_search_within_the_cap_is_not_flagged(client, memory_db):
+    await add_hotels(memory_db, 5)
+
+    resp = await client.get(f"/api/itineraries/{ITINERARY_ID}/reservations", params={"q": "hotel"})
+
+    assert len(resp.json()) == 5
+    assert "x-truncated" not in resp.headers
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def app(memory_db, monkeypatch):
+    """main with index setup, jobs and the backfill stubbed.
+
+    `events` records the order they ran in; the backfill blocks until
+    `release` is set, then raises `error` if one was given.
+    """
+    pytest.importorskip("httpx")
+    import main
+
+    state = SimpleNamespace(main=main, events=[], release=asyncio.Event(), error=None)
+
+    async def ensure_indexes():
+        state.events.append("indexes")
+
+    async def start_jobs():
+        state.events.append("jobs")
+
+    async def backfill(collection):
+        state.events.append("backfill")
+        await state.release.wait()
+        if state.error is not None:
+            raise state.error
+
+    async def ping(timeout):
+        return True
+
+    monkeypatch.setattr(main, "ensure_indexes", ensure_indexes)
+    monkeypatch.setattr(main.jobs, "start", start_jobs)
+    monkeypatch.setattr(main, "backfill_search_tokens", backfill)
+    monkeypatch.setattr(main, "ping", ping)
+    monkeypatch.setattr(main, "startup_task", None)
+    monkeypatch.setattr(main, "backfill_task", None)
+    yield state
+    state.release.set()
+    if main.backfill_task is not None:
+        await asyncio.gather(main.backfill_task, return_exceptions=True)
+
+
+async def readyz(main):
+    import httpx
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/readyz")
+
+
+async def test_ready_and_jobs_started_while_backfill_runs(app, memory_db):
+    app.main.startup_task = asyncio.create_task(app.main.prepare_database(memory_db))
+    await app.main.startup_task
+    await asyncio.sleep(0)
+
+    assert app.events == ["indexes", "jobs", "backfill"]
+    assert not app.main.backfill_task.done()
+    resp = await readyz(app.main)
+    assert resp.status_code == 200 and resp.json() == {"status": "ready"}
+
+    app.release.set()
+    await app.main.backfill_task
+
+
+async def test_failed_backfill_is_logged_and_leaves_readiness(app, memory_db, caplog):
+    app.error = RuntimeError("backfill broke")
+    app.main.startup_task = asyncio.create_task(app.main.prepare_database(memory_db))
+    await app.main.startup_task
+    app.release.set()
+
+    with caplog.at_level(logging.ERROR, logger="main"):
+        await asyncio.gather(app.main.backfill_task, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    assert "Search token backfill failed" in caplog.text
+    assert (await readyz(app.main)).status_code == 200
+
+
+async def test_not_ready_until_indexes_are_built(app, memory_db, monkeypatch):
+    built = asyncio.Event()
+
+    async def slow_indexes():
+        await built.wait()
+
+    monkeypatch.setattr(app.main, "ensure_indexes", slow_indexes)
+    app.main.startup_task = asyncio.create_task(app.main.prepare_database(memory_db))
+    await asyncio.sleep(0)
+
+    resp = await readyz(app.main)
+    assert resp.status_code == 503 and resp.json() == {"status": "starting"}
+    built.set()
+    await app.main.startup_task
+    assert (await readyz(app.main)).status_code == 200
@@ -0,0 +1,204 @@
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import importer
+from providers.base import ProviderNotConfigured, filter_since
+
+pytestmark = pytest.mark.anyio
+
+ITINERARY_ID = "665f1c2e8b3e4a0012345678"
+
+
+def stub_connector(name: str, delay: float = 0.0, error: Exception = None):
+    def fetch_reservations(account, since=None):
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return [{
+            "provider": name, "category": "activity", "title": f"{name} booking",
+            "confirmation_number": f"{name}-1", "source": "api",
+        }]
+    return SimpleNamespace(fetch_reservations=fetch_reservations)
+
+
+class DeltaConnector:
+    """Stub provider with a changes feed: fetches honour `since` like the real connectors"""
+
+    def __init__(self):
+        self.bookings = {}
+        self.calls = []
+        # Sizes of the upsert batches the sync wrote (recorded by the delta fixture)
+        self.upserts = []
+
+    def book(self, ref: str, updated_at: str, title: str = None):
+        self.bookings[ref] = {
+            "provider": "stub", "category": "activity", "title": title or f"Booking {ref}",
+            "confirmation_number": ref, "provider_updated_at": updated_at, "source": "api",
+        }
+
+    def fetch_reservations(self, account, since=None):
+        self.calls.append(since)
+        return filter_since([dict(b) for b in self.bookings.values()], since)
+
+
+@pytest.fixture
+def connectors(monkeypatch):
+    """Replace connector modules with stubs: connectors[name] = stub"""
+    stubs = {}
+    monkeypatch.setattr(importer, "load_connector", lambda key: stubs[key])
+    return stubs
+
+
+async def test_latency_tracks_the_slowest_provider(memory_db, connectors):
+    delays = {"a": 0.1, "b": 0.2, "c": 0.4}
+    for name, delay in delays.items():
+        connectors[name] = stub_connector(name, delay)
+
+    started = time.monotonic()
+    results = await importer.sync_providers(ITINERARY_ID, {n: {} for n in delays}, timeout=5, concurrency=4)
+    elapsed = time.monotonic() - started
+
+    assert all(r["status"] == "ok" and r["created"] == 1 for r in results.values())
+    # Concurrent: about the slowest fetch, well under the 0.7s sum
+    assert elapsed < 0.6
+    assert results["c"]["elapsed_ms"] >= 400
+
+
+async def test_concurrency_limit_serializes_fetches(memory_db, connectors):
+    for name in ("a", "b", "c"):
+        connectors[name] = stub_connector(name, 0.15)
+
+    started = time.monotonic()
+    await importer.sync_providers(ITINERARY_ID, {n: {} for n in "abc"}, timeout=5, concurrency=1)
+    assert time.monotonic() - started >= 0.45
+
+
+async def test_timeout_is_reported_per_provider(memory_db, connectors):
+    connectors["fast"] = stub_connector("fast", 0.05)
+    connectors["hung"] = stub_connector("hung", 1.0)
+
+    started = time.monotonic()
+    results = await importer.sync_providers(ITINERARY_ID, {"fast": {}, "hung": {}}, timeout=0.2)
+
+    assert time.monotonic() - started < 0.8
+    assert results["fast"]["status"] == "ok"
+    assert results["hung"]["status"] == "timeout"
+    assert "items" not in results["fast"]
+
+
+async def test_failures_are_isolated(memory_db, connectors, monkeypatch):
+    connectors["ok"] = stub_connector("ok")
+    connectors["unconfigured"] = stub_connector("unconfigured", error=ProviderNotConfigured("no token"))
+    connectors["broken"] = stub_connector("broken", error=ValueError("bad response"))
+    connectors["db"] = stub_connector("db")
+
+    real_load_account = importer.load_account
+
+    async def load_account(account_id, provider_key):
+        if provider_key == "db":
+            raise RuntimeError("connection reset")
+        return await real_load_account(account_id, provider_key)
+
+    monkeypatch.setattr(importer, "load_account", load_account)
+    results = await importer.sync_providers(
+        ITINERARY_ID, {k: {} for k in connectors}, account_ids={"db": "665f1c2e8b3e4a0000000001"},
+    )
+
+    assert results["ok"]["status"] == "ok"
+    assert results["unconfigured"]["status"] == "not_configured"
+    assert results["broken"]["status"] == "error"
+    assert results["db"]["status"] == "error"
+    assert results["db"]["error"] == "connection reset"
+
+
+@pytest.fixture
+async def delta(memory_db, connectors, monkeypatch):
+    """A DeltaConnector with two bookings, its account id, and a log of upsert calls"""
+    stub = DeltaConnector()
+    stub.book("A-1", "2025-01-01T10:00:00Z")
+    stub.book("A-2", "2025-01-02T10:00:00Z")
+    connectors["stub"] = stub
+    result = await memory_db["account"].insert_one({"provider": "stub", "status": "connected"})
+
+    real_upsert = importer.upsert_documents
+
+    async def upsert_documents(collection, docs, key_fields):
+        stub.upserts.append(len(docs))
+        return await real_upsert(collection, docs, key_fields)
+
+    monkeypatch.setattr(importer, "upsert_documents", upsert_documents)
+    return stub, str(result.inserted_id)
+
+
+async def sync(stub_and_account, full_resync=False):
+    stub, account_id = stub_and_account
+    results = await importer.sync_providers(
+        ITINERARY_ID, {"stub": {}}, account_ids={"stub": account_id}, full_resync=full_resync,
+    )
+    return results["stub"]
+
+
+async def test_unchanged_resync_fetches_since_cursor_and_writes_nothing(memory_db, delta):
+    stub, account_id = delta
+    first = await sync(delta)
+    assert first["mode"] == "full" and first["created"] == 2
+    versions = await memory_db["version"].find().to_list(None)
+
+    second = await sync(delta)
+
+    assert stub.calls == [None, datetime(2025, 1, 2, 10, tzinfo=timezone.utc)]
+    assert second["status"] == "ok" and second["mode"] == "delta"
+    assert second["fetched"] == 0
+    assert all(second[k] == 0 for k in ("created", "updated", "unchanged", "duplicate"))
+    # One upsert for the first sync, none for the second; no version bump either
+    assert stub.upserts == [2]
+    assert await memory_db["version"].find().to_list(None) == versions
+
+
+async def test_delta_sync_fetches_only_changes(memory_db, delta):
+    stub, account_id = delta
+    await sync(delta)
+    stub.book("A-2", "2025-01-05T10:00:00Z", title="Booking A-2 (moved)")
+
+    result = await sync(delta)
+
+    assert result["fetched"] == 1 and result["updated"] == 1
+    account = await memory_db["account"].find_one()
+    assert account["sync_cursor"] == "2025-01-05T10:00:00+00:00"
+
+
+async def test_cursor_holds_when_items_fail_to_save(memory_db, delta, monkeypatch):
+    stub, account_id = delta
+    await sync(delta)
+    stub.book("A-3", "2025-01-07T10:00:00Z")
+
+    async def failing_upsert(collection, docs, key_fields):
+        raise RuntimeError("write failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(importer, "upsert_documents", failing_upsert)
+        failed = await sync(delta)
+    assert len(failed["failed"]) == 1
+    account = await memory_db["account"].find_one()
+    assert account["sync_cursor"] == "2025-01-02T10:00:00+00:00"
+
+    # The next sync asks again from the old cursor and picks the booking up
+    retried = await sync(delta)
+    assert stub.calls[-1] == datetime(2025, 1, 2, 10, tzinfo=timezone.utc)
+    assert retried["created"] == 1
+    account = await memory_db["account"].find_one()
+    assert account["sync_cursor"] == "2025-01-07T10:00:00+00:00"
+
+
+async def test_full_resync_ignores_the_cursor(memory_db, delta):
+    stub, account_id = delta
+    await sync(delta)
+
+    result = await sync(delta, full_resync=True)
+
+    assert stub.calls == [None, None]
+    assert result["mode"] == "full"
+    assert result["fetched"] == 2 and result["unchanged"] == 2
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+pytestmark = pytest.mark.anyio
+
+
+def reservation(itinerary_id, title, category, start):
+    # Every timeline field is set: mongomock drops a $push-ed object that
+    # references a missing field
+    return {"itinerary_id": itinerary_id, "title": title, "category": category, "provider": "viator",
+            "location": "Lisbon", "confirmation_number": None, "start_time": start, "end_time": start}
+
+
+@pytest.fixture
+async def client(memory_db):
+    httpx = pytest.importorskip("httpx")
+    import main
+
+    main.itinerary_cache.clear()
+    main.timeline_cache.clear()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def itinerary_id(memory_db):
+    itinerary = {"_id": ObjectId(), "name": "Trip",
+                 "start_date": datetime(2025, 3, 1), "end_date": datetime(2025, 3, 3)}
+    await memory_db["itinerary"].insert_one(itinerary)
+    iid = str(itinerary["_id"])
+    await memory_db["reservation"].insert_many([
+        reservation(iid, "Dinner", "dining", datetime(2025, 3, 1, 20)),
+        reservation(iid, "Hotel", "lodging", datetime(2025, 3, 1, 15)),
+        reservation(iid, "Tour", "activity", datetime(2025, 3, 3, 9)),
+    ])
+    return iid
+
+
+async def test_days_are_bucketed_in_start_time_order(client, itinerary_id):
+    resp = await client.get(f"/api/itineraries/{itinerary_id}/timeline")
+    assert resp.status_code == 200
+    body = resp.json()
+
+    assert [d["date"] for d in body["days"]] == ["2025-03-01", "2025-03-02", "2025-03-03"]
+    assert [[i["title"] for i in d["items"]] for d in body["days"]] == [["Hotel", "Dinner"], [], ["Tour"]]
+    assert body["days"][0]["categories"] == {"lodging": 1, "dining": 1}
+    assert body["categories"] == {"lodging": 1, "dining": 1, "activity": 1}
+    assert body["count"] == 3
+
+
+async def test_repeat_reads_are_served_from_cache(client, itinerary_id):
+    import main
+
+    url = f"/api/itineraries/{itinerary_id}/timeline"
+    first = await client.get(url)
+    hits = main.timeline_cache.stats()["hits"]
+    second = await client.get(url)
+
+    assert main.timeline_cache.stats()["hits"] == hits + 1
+    assert second.json() == first.json()
+    assert second.headers["etag"] == first.headers["etag"]
+
+    not_modified = await client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304
+
+
+async def test_reservation_write_invalidates_cached_timeline(client, itinerary_id):
+    url = f"/api/itineraries/{itinerary_id}/timeline"
+    before = await client.get(url)
+
+    resp = await client.post("/api/reservations", json={
+        "itinerary_id": itinerary_id, "provider": "viator", "category": "activity", "title": "Museum",
+        "location": "Lisbon", "confirmation_number": "M-1",
+        "start_time": "2025-03-02T10:00:00", "end_time": "2025-03-02T12:00:00",
+    })
+    assert resp.status_code == 200
+
+    after = await client.get(url, headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert [i["title"] for i in after.json()["days"][1]["items"]] == ["Museum"]
+    assert after.json()["count"] == 4
@@ -0,0 +1,107 @@
+import pytest
+from bson import ObjectId
+
+import importer
+from versions import etag_matches
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client(memory_db):
+    httpx = pytest.importorskip("httpx")
+    import main
+
+    main.itinerary_cache.clear()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+async def itinerary_id(memory_db):
+    result = await memory_db["itinerary"].insert_one({"_id": ObjectId(), "name": "Trip"})
+    return str(result.inserted_id)
+
+
+def booking(ref):
+    return {"provider": "viator", "category": "activity", "title": f"Tour {ref}",
+            "confirmation_number": ref, "source": "api"}
+
+
+async def etag(client, url, **params):
+    resp = await client.get(url, params=params)
+    assert resp.status_code == 200
+    return resp.headers["etag"]
+
+
+async def test_unchanged_lists_revalidate_with_304(client, itinerary_id):
+    for url in (f"/api/itineraries/{itinerary_id}/reservations", "/api/itineraries"):
+        tag = await etag(client, url)
+        resp = await client.get(url, headers={"If-None-Match": tag})
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == tag
+        assert resp.content == b""
+
+
+async def test_add_reservation_changes_reservation_list_etag(client, itinerary_id):
+    url = f"/api/itineraries/{itinerary_id}/reservations"
+    before = await etag(client, url)
+
+    resp = await client.post("/api/reservations", json={"itinerary_id": itinerary_id, **booking("R-1")})
+    assert resp.status_code == 200
+
+    resp = await client.get(url, headers={"If-None-Match": before})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != before
+    assert [r["title"] for r in resp.json()] == ["Tour R-1"]
+
+
+async def test_import_batch_changes_reservation_list_etag(client, itinerary_id):
+    url = f"/api/itineraries/{itinerary_id}/reservations"
+    before = await etag(client, url)
+
+    await importer.save_batches(itinerary_id, importer.as_batches([booking("I-1"), booking("I-2")]))
+    after = await etag(client, url)
+    assert after != before
+
+    # Re-importing the same bookings changes nothing, so the tag holds
+    await importer.save_batches(itinerary_id, importer.as_batches([booking("I-1"), booking("I-2")]))
+    assert await etag(client, url) == after
+
+
+async def test_create_itinerary_changes_itinerary_list_etag(client, itinerary_id):
+    before = await etag(client, "/api/itineraries")
+    reservations_before = await etag(client, f"/api/itineraries/{itinerary_id}/reservations")
+
+    resp = await client.post("/api/itineraries", json={
+        "name": "Second trip", "start_date": "2025-05-01T00:00:00", "end_date": "2025-05-04T00:00:00",
+    })
+    assert resp.status_code == 200
+
+    assert await etag(client, "/api/itineraries") != before
+    # Other itineraries' reservation lists keep their tags
+    assert await etag(client, f"/api/itineraries/{itinerary_id}/reservations") == reservations_before
+
+
+async def test_query_string_variants_get_their_own_etags(client, itinerary_id):
+    url = f"/api/itineraries/{itinerary_id}/reservations"
+    plain = await etag(client, url)
+    filtered = await etag(client, url, category="lodging")
+    compact = await etag(client, url, view="compact")
+
+    assert len({plain, filtered, compact}) == 3
+    # Parameter order does not matter
+    assert await etag(client, url, category="lodging", limit=10) == await etag(client, url, limit=10, category="lodging")
+
+    resp = await client.get(url, params={"category": "lodging"}, headers={"If-None-Match": plain})
+    assert resp.status_code == 200
+
+
+def test_if_none_match_parsing():
+    tag = '"3-abc"'
+    assert etag_matches(tag, tag)
+    assert etag_matches(f'"1-xyz", W/{tag}', tag)
+    assert etag_matches("*", tag)
+    assert not etag_matches(None, tag)
+    assert not etag_matches('"2-abc"', tag)
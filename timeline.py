@@ -0,0 +1,101 @@
+"""
+Itinerary Timeline
+
+Day-by-day view of an itinerary built with one aggregation pipeline: the
+itinerary's reservations within its start_date..end_date (as local dates in
+the requested time zone) are sorted by start_time and bucketed by local day.
+Each day is its own result document, so no single document has to hold the
+whole trip; category counts are tallied while the days are read. Every day of
+the trip is present, empty or not.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+TIMELINE_ITEM_FIELDS = ["title", "category", "provider", "location", "start_time", "end_time", "confirmation_number"]
+
+
+class InvalidTimezone(ValueError):
+    pass
+
+
+def get_zone(tz: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise InvalidTimezone(f"Unknown time zone: {tz}")
+
+
+def local_day_bounds(first: date, last: date, zone: ZoneInfo) -> Tuple[datetime, datetime]:
+    """UTC [start, end) covering local days first..last, naive as stored in Mongo"""
+    start = datetime.combine(first, time(), tzinfo=zone).astimezone(timezone.utc)
+    end = datetime.combine(last + timedelta(days=1), time(), tzinfo=zone).astimezone(timezone.utc)
+    return start.replace(tzinfo=None), end.replace(tzinfo=None)
+
+
+def build_pipeline(itinerary_id: str, start: datetime, end: datetime, tz: str) -> List[Dict]:
+    day = {"$dateToString": {"format": "%Y-%m-%d", "date": "$start_time"}}
+    if tz != "UTC":
+        day["$dateToString"]["timezone"] = tz
+    item = {"id": "$_id", **{f: f"${f}" for f in TIMELINE_ITEM_FIELDS}}
+    return [
+        # (itinerary_id, start_time, _id) index serves both stages
+        {"$match": {"itinerary_id": itinerary_id, "start_time": {"$type": "date", "$gte": start, "$lt": end}}},
+        {"$sort": {"start_time": 1, "_id": 1}},
+        # $push keeps the start_time order of the sort above
+        {"$group": {"_id": day, "count": {"$sum": 1}, "items": {"$push": item}}},
+        {"$sort": {"_id": 1}},
+    ]
+
+
+def shape_timeline(rows: List[Dict], first: date, last: date) -> Dict:
+    """One entry per trip day from the pipeline's per-day rows, plus totals"""
+    categories: Dict[str, Dict[str, int]] = {}
+    totals: Dict[str, int] = {}
+    buckets = {}
+    for row in rows:
+        buckets[row["_id"]] = row
+        counts = categories.setdefault(row["_id"], {})
+        for item in row["items"]:
+            category = item.get("category") or "other"
+            counts[category] = counts.get(category, 0) + 1
+            totals[category] = totals.get(category, 0) + 1
+
+    days = []
+    current = first
+    while current <= last:
+        key = current.isoformat()
+        bucket = buckets.get(key, {})
+        days.append({
+            "date": key,
+            "count": bucket.get("count", 0),
+            "categories": categories.get(key, {}),
+            "items": bucket.get("items", []),
+        })
+        current += timedelta(days=1)
+    return {"days": days, "count": sum(totals.values()), "categories": totals}
+
+
+async def build_timeline(db, itinerary: Dict, tz: str = "UTC") -> Dict:
+    zone = get_zone(tz)
+    itinerary_id = str(itinerary["_id"])
+    first, last = itinerary["start_date"].date(), itinerary["end_date"].date()
+    if last < first:
+        last = first
+    start, end = local_day_bounds(first, last, zone)
+
+    # Large trips can outgrow $group's in-memory limit
+    pipeline = build_pipeline(itinerary_id, start, end, tz)
+    rows = await db["reservation"].aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+    timeline = shape_timeline(rows, first, last)
+    unscheduled = await db["reservation"].count_documents({"itinerary_id": itinerary_id, "start_time": None})
+    return {
+        "itinerary_id": itinerary_id,
+        "timezone": tz,
+        "start_date": first.isoformat(),
+        "end_date": last.isoformat(),
+        **timeline,
+        # No start_time, so not placed on any day
+        "unscheduled": unscheduled,
+    }
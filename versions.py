@@ -0,0 +1,53 @@
+"""
+Change Versions
+
+Monotonic counters kept in the "version" collection, one per cached view:
+"itineraries" for the itinerary list and "itinerary:<id>" for an itinerary's
+reservations. Every write path bumps the matching counter after it writes,
+so a list read under version N can be revalidated by comparing N alone,
+from any process, without touching the documents.
+"""
+
+import hashlib
+from typing import Optional
+
+from pymongo import UpdateOne
+
+from async_database import get_db
+
+VERSION_COLLECTION = "version"
+ITINERARIES_KEY = "itineraries"
+
+
+def itinerary_key(itinerary_id: str) -> str:
+    return f"itinerary:{itinerary_id}"
+
+
+async def bump(*keys: str) -> None:
+    """Increment the counters for `keys`, creating them on first write"""
+    db = get_db()
+    if db is None or not keys:
+        return
+    ops = [UpdateOne({"_id": k}, {"$inc": {"v": 1}}, upsert=True) for k in dict.fromkeys(keys)]
+    await db[VERSION_COLLECTION].bulk_write(ops, ordered=False)
+
+
+async def get_version(key: str) -> int:
+    doc = await get_db()[VERSION_COLLECTION].find_one({"_id": key}, {"v": 1})
+    return doc["v"] if doc else 0
+
+
+def make_etag(key: str, version: int, variant: str = "") -> str:
+    """Strong ETag for a view at a version; `variant` covers query parameters"""
+    digest = hashlib.sha1(f"{key}\0{version}\0{variant}".encode("utf-8")).hexdigest()[:20]
+    return f'"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers `etag` (weak tags compare equal)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (t.strip() for t in if_none_match.split(","))
+    return any(t.removeprefix("W/") == etag for t in tags)